@@ -3,6 +3,13 @@ from logging.handlers import RotatingFileHandler
 import yaml
 import time
 import os
+import random
+import re
+import contextlib
+import html
+import copy
+import functools
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 from src.db import init_db, get_last_checked, update_last_checked
 from src.reddit_client import RedditClient
@@ -12,6 +19,8 @@ import smtplib
 from email.message import EmailMessage
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+# Log files aren't tracked, so the directory may not exist in a fresh checkout
+os.makedirs('logs', exist_ok=True)
 log_handler = RotatingFileHandler(
     'logs/app.log', maxBytes=5 * 1024 * 1024, backupCount=5  # 5 MB per file, keep 5 backups
 )
@@ -23,6 +32,61 @@ logging.basicConfig(
     level=logging.INFO
 )
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+_ENV_PREFIX = "MEDIA_MONITOR_"
+
+
+_TRUE_VALUES = frozenset(('true', '1', 'yes', 'on', 'y', 't'))
+_FALSE_VALUES = frozenset(('false', '0', 'no', 'off', 'n', 'f'))
+
+
+def _to_bool(value):
+    value = value.strip().lower()
+    if value in _TRUE_VALUES:
+        return True
+    if value in _FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+_ADDRESS_SEPARATOR = re.compile(r'\s*,\s*')
+
+
+def _split_addresses(value):
+    value = value.strip()
+    return _ADDRESS_SEPARATOR.split(value) if value else []
+
+
+# Type conversions for overridden fields, keyed on (service, field); None matches any service
+_ENV_COERCERS = {
+    (None, 'enabled'): _to_bool,
+    (None, 'port'): int,
+    ('smtp', 'to'): _split_addresses,
+    ('smtp', 'send_empty'): _to_bool,
+    ('smtp', 'retry_deadline'): float,
+    ('youtube', 'cache_ttl_minutes'): float,
+    ('youtube', 'requests_per_second'): float,
+    ('youtube', 'max_concurrency'): int,
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_env_key(env_key):
+    """Resolve a MEDIA_MONITOR_-prefixed variable name to (service, field, coerce).
+
+    Returns None for names that don't have both a <SERVICE> and a <FIELD> part.
+    Cached so each distinct name is only split once per process.
+    """
+    service, _, field = env_key[len(_ENV_PREFIX):].lower().partition('_')
+    if not service or not field:
+        return None
+
+    coerce = _ENV_COERCERS.get((service, field)) or _ENV_COERCERS.get((None, field))
+    return service, field, coerce
+
 
 def _apply_env_overrides(config):
     """Apply environment variable overrides to configuration.
@@ -34,49 +98,60 @@ def _apply_env_overrides(config):
     - MEDIA_MONITOR_REDDIT_CLIENT_ID overrides reddit.client_id
     - MEDIA_MONITOR_SMTP_PASSWORD overrides smtp.password
     - MEDIA_MONITOR_YOUTUBE_API_KEY overrides youtube.api_key
+
+    Returns a new config. Only the sections that receive an override are
+    copied, and the config passed in is left untouched. A config that isn't a
+    dict is returned as is, so validate_config can report it.
     """
-    env_prefix = "MEDIA_MONITOR_"
+    if not isinstance(config, dict):
+        return config
 
-    for env_key, env_value in os.environ.items():
-        if not env_key.startswith(env_prefix):
-            continue
+    overridden = dict(config)
+    copied_sections = set()
 
-        # Parse the environment variable name
-        config_path = env_key[len(env_prefix):].lower().split('_')
-        if len(config_path) < 2:
+    env = os.environ
+    for env_key, env_value in env.items():
+        # Filter here so unrelated variables never reach (or evict entries from) the parse cache
+        if not env_key.startswith(_ENV_PREFIX):
             continue
 
-        service = config_path[0]
-        field = '_'.join(config_path[1:])
+        override = _parse_env_key(env_key)
+        if override is None:
+            continue
 
-        # Apply the override
-        if service not in config:
-            config[service] = {}
+        service, field, coerce = override
 
         # Convert certain values to appropriate types
-        if field == 'enabled':
-            env_value = env_value.lower() in ('true', '1', 'yes', 'on')
-        elif field == 'port':
+        if coerce is not None:
             try:
-                env_value = int(env_value)
+                env_value = coerce(env_value)
             except ValueError:
-                logging.warning(f"Invalid port value in {env_key}: {env_value}")
+                logging.warning("Invalid %s value in %s: %s", field, env_key, env_value)
                 continue
-        elif field == 'to' and service == 'smtp':
-            # Split comma-separated email addresses
-            env_value = [email.strip() for email in env_value.split(',')]
 
-        config[service][field] = env_value
-        logging.info(f"Applied environment override: {service}.{field}")
+        if service not in copied_sections:
+            overridden[service] = dict(overridden.get(service) or {})
+            copied_sections.add(service)
+        overridden[service][field] = env_value
+        logging.info("Applied environment override: %s.%s", service, field)
+
+    return overridden
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_config_file(path, mtime_ns, size):
+    """Parse a YAML config file.
+
+    Cached on (path, mtime_ns, size) so an unchanged file is only read and parsed once.
+    """
+    with open(path, 'r') as file:
+        return yaml.load(file, Loader=_YAML_LOADER)
 
 
 def load_config(filename='config/config.yaml'):
     try:
-        with open(filename, 'r') as file:
-            config = yaml.safe_load(file)
-            _apply_env_overrides(config)
-            validate_config(config)
-            return config
+        stat = os.stat(filename)
+        parsed = _parse_config_file(os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
     except FileNotFoundError:
         logging.error(f"Configuration file not found: {filename}")
         raise
@@ -84,68 +159,72 @@ def load_config(filename='config/config.yaml'):
         logging.error(f"Invalid YAML in configuration file: {e}")
         raise
 
+    # Env overrides and callers mutate the config, so never hand out the cached object
+    config = _apply_env_overrides(copy.deepcopy(parsed))
+    validate_config(config)
+    return config
+
+
+load_config.cache_clear = _parse_config_file.cache_clear
+
+
+# Checked for each enabled service: (config section, display name, required fields,
+# source keys of which at least one must be set)
+_SERVICE_RULES = (
+    ('reddit', 'Reddit', ('client_id', 'client_secret', 'user_agent'), ('subreddits', 'categories')),
+    ('youtube', 'YouTube', ('api_key',), ('channels', 'categories')),
+    ('bluesky', 'Bluesky', (), ('users', 'categories')),
+    ('smtp', 'SMTP', ('server', 'port', 'username', 'password', 'from', 'to'), ()),
+)
+
+
+def _validate_smtp_values(smtp_config):
+    """Check SMTP fields that need more than a presence check."""
+    # Validate port is a number
+    try:
+        int(smtp_config['port'])
+    except (ValueError, TypeError):
+        raise ValueError("SMTP port must be a valid integer")
+
+    # Validate 'to' is a list
+    if not isinstance(smtp_config['to'], list):
+        raise ValueError("SMTP 'to' field must be a list of email addresses")
+
 
 def validate_config(config):
     """Validate configuration structure and required fields."""
     if not isinstance(config, dict):
         raise ValueError("Configuration must be a dictionary")
 
-    # Validate Reddit configuration if enabled
-    reddit_config = config.get('reddit', {})
-    if reddit_config.get('enabled', False):
-        required_reddit_fields = ['client_id', 'client_secret', 'user_agent']
-        for field in required_reddit_fields:
-            if not reddit_config.get(field):
-                raise ValueError(f"Reddit configuration missing required field: {field}")
-
-        # Validate Reddit has either subreddits or categories
-        if not reddit_config.get('subreddits') and not reddit_config.get('categories'):
-            raise ValueError("Reddit configuration must specify either 'subreddits' or 'categories'")
-
-    # Validate YouTube configuration if enabled
-    youtube_config = config.get('youtube', {})
-    if youtube_config.get('enabled', False):
-        if not youtube_config.get('api_key'):
-            raise ValueError("YouTube configuration missing required field: api_key")
-
-        # Validate YouTube has either channels or categories
-        if not youtube_config.get('channels') and not youtube_config.get('categories'):
-            raise ValueError("YouTube configuration must specify either 'channels' or 'categories'")
-
-    # Validate Bluesky configuration if enabled
-    bluesky_config = config.get('bluesky', {})
-    if bluesky_config.get('enabled', False):
-        # Validate Bluesky has either users or categories
-        if not bluesky_config.get('users') and not bluesky_config.get('categories'):
-            raise ValueError("Bluesky configuration must specify either 'users' or 'categories'")
-
-    # Validate SMTP configuration if enabled
-    smtp_config = config.get('smtp', {})
-    if smtp_config.get('enabled', False):
-        required_smtp_fields = ['server', 'port', 'username', 'password', 'from', 'to']
-        for field in required_smtp_fields:
-            if not smtp_config.get(field):
-                raise ValueError(f"SMTP configuration missing required field: {field}")
-
-        # Validate port is a number
-        try:
-            int(smtp_config['port'])
-        except (ValueError, TypeError):
-            raise ValueError("SMTP port must be a valid integer")
+    for section, display_name, required_fields, source_keys in _SERVICE_RULES:
+        # Skip disabled or empty sections before looking at any of their fields
+        service_config = config.get(section)
+        if not service_config or not service_config.get('enabled', False):
+            continue
+
+        for field in required_fields:
+            if not service_config.get(field):
+                raise ValueError(f"{display_name} configuration missing required field: {field}")
+
+        if source_keys and not any(service_config.get(key) for key in source_keys):
+            options = "' or '".join(source_keys)
+            raise ValueError(f"{display_name} configuration must specify either '{options}'")
 
-        # Validate 'to' is a list
-        if not isinstance(smtp_config['to'], list):
-            raise ValueError("SMTP 'to' field must be a list of email addresses")
+        if section == 'smtp':
+            _validate_smtp_values(service_config)
 
     logging.info("Configuration validation passed")
 
 
 def process_source(source_name, client_class, config):
     items = []
-    if config.get(source_name, {}).get("enabled"):
+    # Look the section and display name up once; an empty YAML section loads as None
+    source_config = config.get(source_name) or {}
+    display_name = source_name.capitalize()
+    if source_config.get("enabled"):
         try:
-            logging.info(f"{source_name.capitalize()} integration is enabled.")
-            client = client_class(config[source_name])
+            logging.info(f"{display_name} integration is enabled.")
+            client = client_class(source_config)
             last_checked = get_last_checked(source_name)
             if last_checked:
                 last_checked = datetime.fromisoformat(last_checked)
@@ -154,17 +233,15 @@ def process_source(source_name, client_class, config):
             else:
                 last_checked = datetime.now(timezone.utc) - timedelta(hours=72)
                 logging.info(f"No previous check found, using last 72 hours as initial window for {source_name}.")
-            logging.info(f"Last checked time for {source_name.capitalize()}: {last_checked}")
+            logging.info(f"Last checked time for {display_name}: {last_checked}")
 
             new_items = client.get_new_items_since(last_checked)
-            item_type = f"{source_name.capitalize()} items"
-
-            logging.info(f"Found {len(new_items)} new {item_type} since last checked.")
+            logging.info(f"Found {len(new_items)} new {display_name} items since last checked.")
             for item in new_items:
-                logging.debug(f"New {source_name} item: {item['title']} (ID: {item['id']})")
+                logging.debug("New %s item: %s (ID: %s)", source_name, item['title'], item['id'])
 
             update_last_checked(source_name, datetime.now(timezone.utc))
-            logging.info(f"Updated last checked time for {source_name.capitalize()} in the database.")
+            logging.info(f"Updated last checked time for {display_name} in the database.")
             items = new_items
         except Exception as e:
             logging.error(f"Error processing {source_name}: {e}")
@@ -173,52 +250,40 @@ def process_source(source_name, client_class, config):
 
 
 def load_smtp_settings(config):
-    smtp_cfg = config.get("smtp", {})
+    smtp_cfg = config.get("smtp") or {}
     if not smtp_cfg.get("enabled", False):
         logging.info("SMTP is not enabled in config.")
         return None
     return smtp_cfg
 
 
+def _source_key(item):
+    """Return the source an item came from (subreddit, channel_name, or author)."""
+    return item.get('subreddit') or item.get('channel_name') or item.get('author', 'unknown')
+
+
 def group_items_by_category_and_source(items):
     """
     Group items by category (optional) and then by source (subreddit/channel).
     Returns a nested dict structure.
     """
-    if not items:
-        return {}
-
-    # First group by category if categories exist
+    # Without any categories everything is 'uncategorized'; once some item has one,
+    # each item keeps its own category value (None and '' included)
     has_categories = any(item.get('category') for item in items)
 
-    if has_categories:
-        # Group by category first
-        categorized = {}
-        for item in items:
-            category = item.get('category', 'uncategorized')
-            if category not in categorized:
-                categorized[category] = []
-            categorized[category].append(item)
-
-        # Then group each category by source
-        result = {}
-        for category, category_items in categorized.items():
-            result[category] = group_by_source(category_items)
-        return result
-    else:
-        # No categories, just group by source
-        return {'uncategorized': group_by_source(items)}
+    grouped = {}
+    for item in items:
+        category = item.get('category', 'uncategorized') if has_categories else 'uncategorized'
+        grouped.setdefault(category, {}).setdefault(_source_key(item), []).append(item)
+    return grouped
 
 
 def group_by_source(items):
     """Group items by their source (subreddit, channel_name, or author)."""
-    grouped = {}
+    grouped = defaultdict(list)
     for item in items:
-        source = item.get('subreddit') or item.get('channel_name') or item.get('author', 'unknown')
-        if source not in grouped:
-            grouped[source] = []
-        grouped[source].append(item)
-    return grouped
+        grouped[_source_key(item)].append(item)
+    return dict(grouped)
 
 
 def _setup_jinja_environment():
@@ -234,15 +299,18 @@ def _setup_jinja_environment():
     return env
 
 
+@functools.lru_cache(maxsize=None)
+def _get_template(name):
+    """Load and compile an email template once per process."""
+    return _setup_jinja_environment().get_template(name)
+
+
 def format_email_content(all_items):
     """Format email content using Jinja2 templates.
 
     Returns:
         tuple: (plain_text_body, html_body)
     """
-    # Set up Jinja2 environment
-    env = _setup_jinja_environment()
-
     # Prepare template context
     has_items = any(items for items in all_items.values())
 
@@ -254,8 +322,8 @@ def format_email_content(all_items):
 
     # Render templates
     try:
-        text_template = env.get_template('email_template.txt')
-        html_template = env.get_template('email_template.html')
+        text_template = _get_template('email_template.txt')
+        html_template = _get_template('email_template.html')
 
         plain_text = text_template.render(context)
         html_content = html_template.render(context)
@@ -263,20 +331,30 @@ def format_email_content(all_items):
         return plain_text, html_content
 
     except Exception as e:
-        logging.error(f"Error rendering email templates: {e}")
-        # Fallback to simple content
-        if has_items:
-            fallback_text = f"New items found from {len(all_items)} services. Check the application logs for details."
-            fallback_html = f"<p>{fallback_text}</p>"
-        else:
-            fallback_text = "No new items found from any source."
-            fallback_html = f"<p>{fallback_text}</p>"
+        logging.error("Error rendering email templates: %s", e)
+        return _format_fallback_content(all_items, has_items)
 
-        return fallback_text, fallback_html
 
+def _format_fallback_content(all_items, has_items):
+    """Build a plain (text, html) report listing item titles, used when templates fail."""
+    if not has_items:
+        fallback_text = "No new items found from any source."
+        return fallback_text, f"<p>{fallback_text}</p>"
 
-def send_email(smtp_cfg, all_items):
-    """Send email notification with formatted content using Jinja2 templates."""
+    summary = f"New items found from {len(all_items)} services. Check the application logs for details."
+    titles = [str(item.get('title') or '(no title)') for items in all_items.values() for item in items]
+
+    fallback_text = "\n".join([summary, "", *(f"- {title}" for title in titles)])
+    fallback_html = "".join([
+        f"<p>{summary}</p><ul>",
+        *(f"<li>{html.escape(title)}</li>" for title in titles),
+        "</ul>",
+    ])
+    return fallback_text, fallback_html
+
+
+def _build_message(smtp_cfg, all_items):
+    """Build the report EmailMessage for one set of items."""
     msg = EmailMessage()
     msg["Subject"] = "Media Monitor Report"
     msg["From"] = smtp_cfg["from"]
@@ -288,49 +366,117 @@ def send_email(smtp_cfg, all_items):
     # Set message content
     msg.set_content(plain_text)
     msg.add_alternative(html_content, subtype='html')
+    return msg
+
+
+def _should_send(smtp_cfg, all_items):
+    """Return False for an empty report when smtp.send_empty is turned off."""
+    if any(all_items.values()) or smtp_cfg.get("send_empty", True):
+        return True
+    logging.info("No new items and smtp.send_empty is disabled; skipping email.")
+    return False
+
+
+def send_email(smtp_cfg, all_items):
+    """Send email notification with formatted content using Jinja2 templates."""
+    if not _should_send(smtp_cfg, all_items):
+        return
+    _send_messages_with_retry(smtp_cfg, [_build_message(smtp_cfg, all_items)])
+
 
-    # Send email with retry logic
-    _send_email_with_retry(smtp_cfg, msg)
+def send_emails(smtp_cfg, item_batches):
+    """Send one report per batch of items, sharing a single SMTP connection and login."""
+    messages = [
+        _build_message(smtp_cfg, all_items)
+        for all_items in item_batches
+        if _should_send(smtp_cfg, all_items)
+    ]
+    if messages:
+        _send_messages_with_retry(smtp_cfg, messages)
 
 
-def _send_email_with_retry(smtp_cfg, msg, max_retries=3, base_delay=1.0):
-    """Send email with exponential backoff retry logic."""
+@contextlib.contextmanager
+def _smtp_session(smtp_cfg):
+    """Open an authenticated SMTP_SSL connection that can send any number of messages."""
+    with smtplib.SMTP_SSL(smtp_cfg["server"], smtp_cfg["port"]) as server:
+        server.login(smtp_cfg["username"], smtp_cfg["password"])
+        yield server
+
+
+def _serialize_message(msg, utf8=False):
+    """Flatten a message to the CRLF-delimited bytes sent over SMTP.
+
+    With utf8 set, headers are written as raw UTF-8 for an SMTPUTF8 transaction,
+    as smtplib's send_message does for non-ASCII addresses.
+    """
+    return msg.as_bytes(policy=msg.policy.clone(linesep='\r\n', utf8=utf8))
+
+
+def _send_messages_with_retry(smtp_cfg, messages, max_retries=3, base_delay=1.0):
+    """Send messages over one SMTP session with exponential backoff retry logic.
+
+    If connecting fails or the server disconnects, the session is reopened and
+    sending resumes with the first message that wasn't delivered. A message the
+    server rejects (e.g. a 554 content refusal) is logged and skipped without
+    reconnecting, since resending it would fail the same way. Each backoff adds
+    up to base_delay of random jitter so concurrently scheduled runs don't
+    reconnect in lockstep, and no retry is started that would end past
+    smtp.retry_deadline seconds (default 30).
+
+    Returns True only if every message was delivered.
+    """
+    deadline = time.monotonic() + smtp_cfg.get("retry_deadline", 30)
+    # Non-ASCII addresses need SMTPUTF8, which send_message would have negotiated for us
+    international = not "".join([smtp_cfg["from"], *smtp_cfg["to"]]).isascii()
+    mail_options = ('SMTPUTF8', 'BODY=8BITMIME') if international else ()
+    # Serialize up front so retries resend the same bytes instead of re-encoding the MIME tree
+    payloads = [_serialize_message(msg, utf8=international) for msg in messages]
+    sent = 0
+    rejected = 0
     for attempt in range(max_retries):
         try:
-            with smtplib.SMTP_SSL(smtp_cfg["server"], smtp_cfg["port"]) as server:
-                server.login(smtp_cfg["username"], smtp_cfg["password"])
-                server.send_message(msg)
-            logging.info("Email sent successfully.")
-            return True
+            with _smtp_session(smtp_cfg) as server:
+                while sent < len(payloads):
+                    try:
+                        server.sendmail(smtp_cfg["from"], smtp_cfg["to"], payloads[sent], mail_options)
+                    except (smtplib.SMTPServerDisconnected, smtplib.SMTPRecipientsRefused):
+                        raise  # Reconnect, or give up on the recipients, below
+                    except smtplib.SMTPException as e:
+                        logging.error("SMTP server rejected message %d of %d: %s", sent + 1, len(payloads), e)
+                        rejected += 1
+                    else:
+                        logging.info("Email sent successfully.")
+                    sent += 1
+            return rejected == 0
 
         except smtplib.SMTPAuthenticationError as e:
-            logging.error(f"SMTP Authentication failed: {e}")
+            logging.error("SMTP Authentication failed: %s", e)
             # Don't retry authentication failures
             return False
 
         except smtplib.SMTPRecipientsRefused as e:
-            logging.error(f"SMTP Recipients refused: {e}")
+            logging.error("SMTP Recipients refused: %s", e)
             # Don't retry recipient errors
             return False
 
         except (smtplib.SMTPConnectError, smtplib.SMTPServerDisconnected, smtplib.SMTPException) as e:
             attempt_num = attempt + 1
-            if attempt_num < max_retries:
-                delay = base_delay * (2 ** attempt)  # Exponential backoff
-                logging.warning(f"SMTP error on attempt {attempt_num}/{max_retries}: {e}. Retrying in {delay:.1f} seconds...")
+            delay = base_delay * (2 ** attempt) + random.uniform(0, base_delay)  # Exponential backoff with jitter
+            if attempt_num < max_retries and time.monotonic() + delay < deadline:
+                logging.warning("SMTP error on attempt %d/%d: %s. Retrying in %.1f seconds...", attempt_num, max_retries, e, delay)
                 time.sleep(delay)
             else:
-                logging.error(f"Failed to send email after {max_retries} attempts: {e}")
+                logging.error("Failed to send email after %d attempts: %s", attempt_num, e)
                 return False
 
         except Exception as e:
             attempt_num = attempt + 1
-            if attempt_num < max_retries:
-                delay = base_delay * (2 ** attempt)  # Exponential backoff
-                logging.warning(f"Unexpected error on attempt {attempt_num}/{max_retries}: {e}. Retrying in {delay:.1f} seconds...")
+            delay = base_delay * (2 ** attempt) + random.uniform(0, base_delay)  # Exponential backoff with jitter
+            if attempt_num < max_retries and time.monotonic() + delay < deadline:
+                logging.warning("Unexpected error on attempt %d/%d: %s. Retrying in %.1f seconds...", attempt_num, max_retries, e, delay)
                 time.sleep(delay)
             else:
-                logging.error(f"Failed to send email after {max_retries} attempts with unexpected error: {e}")
+                logging.error("Failed to send email after %d attempts with unexpected error: %s", attempt_num, e)
                 return False
 
     return False
@@ -9,12 +9,14 @@ class BaseMediaClient(ABC):
         # Support both simple and categorized formats
         if "categories" in config:
             self.categories = config["categories"]
-            self.items = []
+            items = []
             for category_items in self.categories.values():
-                self.items.extend(category_items)
+                items.extend(category_items)
         else:
             self.categories = None
-            self.items = self._get_items_from_config(config)
+            items = self._get_items_from_config(config)
+        # Drop repeated sources (e.g. listed under two categories) so each is fetched once
+        self.items = list(dict.fromkeys(items))
 
     @abstractmethod
     def _get_items_from_config(self, config):
@@ -26,6 +28,14 @@ class BaseMediaClient(ABC):
         """Fetch items from a specific source (subreddit/channel). Override in subclasses."""
         pass
 
+    def _fetch_sources(self, items, since_datetime):
+        """
+        Yield (item, fetched_items) pairs in the order of items.
+        Override in subclasses to fetch several sources concurrently.
+        """
+        for item in items:
+            yield item, self._fetch_items_for_source(item, since_datetime)
+
     def _pre_fetch_optimization(self, items):
         """
         Optional optimization hook for batch operations before fetching items.
@@ -33,13 +43,11 @@ class BaseMediaClient(ABC):
         """
         pass
 
-    def get_new_items_since(self, since_datetime):
+    def iter_new_items_since(self, since_datetime):
         """
-        Retrieve new items since the given datetime.
-        Returns a list of dicts with item info, including category if categorized.
+        Yield new items since the given datetime, one source at a time.
+        Each item is a dict with item info, including category if categorized.
         """
-        new_items = []
-
         # Allow subclasses to optimize with batch operations
         self._pre_fetch_optimization(self.items)
 
@@ -50,14 +58,17 @@ class BaseMediaClient(ABC):
                 for item in item_list:
                     item_to_category[item] = category
 
-        for item in self.items:
-            items_from_source = self._fetch_items_for_source(item, since_datetime)
-
+        for item, items_from_source in self._fetch_sources(self.items, since_datetime):
             # Add category if using categorized format
             if self.categories:
                 for item_data in items_from_source:
                     item_data["category"] = item_to_category.get(item, "uncategorized")
 
-            new_items.extend(items_from_source)
+            yield from items_from_source
 
-        return new_items
\ No newline at end of file
+    def get_new_items_since(self, since_datetime):
+        """
+        Retrieve new items since the given datetime.
+        Returns a list of dicts with item info, including category if categorized.
+        """
+        return list(self.iter_new_items_since(since_datetime))
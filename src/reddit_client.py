@@ -1,10 +1,14 @@
 import logging
 from datetime import datetime, timezone
+from operator import attrgetter
 
 import praw
 
 from .base_client import BaseMediaClient
 
+# Submission attributes read for each post newer than the cutoff
+_SUBMISSION_FIELDS = attrgetter("id", "title", "url", "permalink", "score", "is_self")
+
 
 class RedditClient(BaseMediaClient):
     def __init__(self, config):
@@ -59,14 +63,18 @@ class RedditClient(BaseMediaClient):
                     submission.created_utc, tz=timezone.utc
                 )
                 if created_utc > since_datetime:
+                    post_id, title, url, permalink, score, is_self = (
+                        _SUBMISSION_FIELDS(submission)
+                    )
+
                     # Apply karma filter
-                    if submission.score < min_karma:
+                    if score < min_karma:
                         continue
 
-                    reddit_url = f"https://reddit.com{submission.permalink}"
+                    reddit_url = f"https://reddit.com{permalink}"
 
                     # Determine post type and URLs
-                    if submission.is_self:
+                    if is_self:
                         # Self post - discussion only happens on Reddit
                         post_type = "self"
                         external_url = None
@@ -74,12 +82,12 @@ class RedditClient(BaseMediaClient):
                     else:
                         # Link post - has external content
                         post_type = "link"
-                        external_url = submission.url
-                        primary_url = submission.url
+                        external_url = url
+                        primary_url = url
 
                     post_data = {
-                        "id": submission.id,
-                        "title": submission.title,
+                        "id": post_id,
+                        "title": title,
                         "url": primary_url,  # Maintains backward compatibility
                         "reddit_url": reddit_url,
                         "external_url": external_url,
@@ -87,7 +95,7 @@ class RedditClient(BaseMediaClient):
                         "created_utc": created_utc,
                         "permalink": reddit_url,  # Backward compatibility
                         "subreddit": subreddit,
-                        "score": submission.score,
+                        "score": score,
                     }
                     posts.append(post_data)
         except praw.exceptions.PRAWException as e:
@@ -1,8 +1,99 @@
+import functools
+import hashlib
+import json
 import logging
+import os
+import threading
+import time
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+from googleapiclient.model import JsonModel
 from datetime import datetime, timezone
+from pathlib import Path
 from .base_client import BaseMediaClient
 
+# Default upper bound on channels fetched at once; each worker holds its own HTTP connection
+MAX_FETCH_WORKERS = 8
+
+# Retries googleapiclient makes, with exponential backoff, on 429/5xx and rate-limit 403s
+API_RETRIES = 5
+
+# Safety cap on uploads pages read per channel (50 videos each)
+MAX_UPLOAD_PAGES = 10
+
+WATCH_URL_PREFIX = "https://www.youtube.com/watch?v="
+
+# Optional per-video metadata fetched with videos.list: item key -> (part, field)
+VIDEO_DETAILS = {
+    "duration": ("contentDetails", "duration"),
+    "view_count": ("statistics", "viewCount"),
+}
+
+# Partial-response masks: only the fields read below are sent back
+CHANNEL_FIELDS = "items(id,snippet/title,contentDetails/relatedPlaylists/uploads)"
+PLAYLIST_ITEM_FIELDS = "etag,nextPageToken,items(snippet/title,contentDetails(videoId,videoPublishedAt))"
+
+
+def _utc_prefix(dt):
+    """
+    Format dt as a UTC YYYY-MM-DDTHH:MM:SS string. API timestamps in this format
+    sort as strings in time order, so their first 19 characters compare against it directly.
+    """
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+class _OrjsonModel(JsonModel):
+    """JsonModel that decodes response bodies with orjson instead of the stdlib json module."""
+
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Let the stdlib path produce its usual fallback for non-JSON bodies
+            return super().deserialize(content)
+        if self._data_wrapper and "data" in body:
+            body = body["data"]
+        return body
+
+
+@functools.lru_cache(maxsize=8)
+def _build_service(api_key):
+    """
+    Build the YouTube service from the discovery document bundled with the library,
+    so no network fetch is made. Cached so clients sharing a key parse it only once;
+    requests are executed on per-thread HTTP objects, so sharing the service is safe.
+    """
+    return build(
+        "youtube", "v3", developerKey=api_key, model=_OrjsonModel(),
+        static_discovery=True, cache_discovery=False
+    )
+
+
+class _RateLimiter:
+    """Thread-safe token bucket allowing `rate` calls per second, in bursts of up to `rate`."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, sleeping until one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token even when the bucket is empty; the debt is paid by sleeping
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
 class YouTubeClient(BaseMediaClient):
     def __init__(self, config):
         """
@@ -22,20 +113,91 @@ class YouTubeClient(BaseMediaClient):
         """
         super().__init__(config)
         self.api_key = config["api_key"]
-        self.youtube = build("youtube", "v3", developerKey=self.api_key)
+        self.youtube = _build_service(self.api_key)
         self.channels = self.items
         self.channel_names_cache = {}
+        self.upload_playlists = {}
+        # Last first page of each uploads playlist, revalidated by ETag on the next listing
+        self.etag_responses = {}
+        self._local = threading.local()
+        # Opt-in on-disk response cache; a TTL of 0 (the default) disables it
+        self.cache_ttl = float(config.get("cache_ttl_minutes", 0)) * 60
+        self.cache_dir = Path(config.get("cache_dir", "data/cache/youtube"))
+        # Spaces out API calls from the fetch threads; 0 disables the limit
+        rate = float(config.get("requests_per_second", 50))
+        self._limiter = _RateLimiter(rate) if rate > 0 else None
+        self.max_concurrency = int(config.get("max_concurrency", MAX_FETCH_WORKERS))
+        # Extra metadata to look up for new videos; none by default, which skips the lookup
+        video_details = config.get("video_details") or []
+        if not isinstance(video_details, (list, tuple)):
+            raise ValueError(f"YouTube 'video_details' must be a list, got {video_details!r}")
+        self.video_details = []
+        for detail in video_details:
+            if detail in VIDEO_DETAILS:
+                self.video_details.append(detail)
+            else:
+                logging.warning(f"Ignoring unknown YouTube video detail '{detail}'")
 
     def _get_items_from_config(self, config):
         """Extract channels list from config for simple format."""
         return config.get("channels", [])
 
+    def _http(self):
+        """Return this thread's HTTP connection; httplib2 objects are not thread-safe."""
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = self._local.http = build_http()
+        return http
+
+    def _execute(self, request):
+        """Execute an API request under the rate limit, retrying transient and quota errors."""
+        if self._limiter is not None:
+            self._limiter.acquire()
+        return request.execute(http=self._http(), num_retries=API_RETRIES)
+
+    def _execute_conditional(self, request, key):
+        """
+        Execute a request, revalidating the response last stored under key.
+        An unchanged resource comes back as a bodiless 304 and the stored response is reused.
+        """
+        cached = self.etag_responses.get(key)
+        if cached is not None:
+            request.headers["If-None-Match"] = cached["etag"]
+        try:
+            response = self._execute(request)
+        except HttpError as e:
+            if cached is None or e.resp.status != 304:
+                raise
+            return cached
+        if "etag" in response:
+            self.etag_responses[key] = response
+        return response
+
+    def _fetch_sources(self, channel_ids, since_datetime):
+        """
+        Fetch up to max_concurrency channels at once, yielding results in channel order.
+        Each channel is yielded as soon as it and the channels before it are done.
+        """
+        if len(channel_ids) < 2 or self.max_concurrency < 2:
+            yield from super()._fetch_sources(channel_ids, since_datetime)
+            return
+
+        workers = min(len(channel_ids), self.max_concurrency)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda channel_id: self._fetch_items_for_source(channel_id, since_datetime),
+                channel_ids
+            )
+            yield from zip(channel_ids, results)
+
     def _pre_fetch_optimization(self, channel_ids):
-        """Batch fetch channel names for all channels at once."""
+        """Batch fetch channel names for all channels at once, and drop expired cache entries."""
         self._batch_fetch_channel_names(channel_ids)
+        if self.cache_ttl:
+            self._prune_cache()
 
     def _batch_fetch_channel_names(self, channel_ids):
-        """Fetch channel names for multiple channel IDs in a single API call."""
+        """Fetch channel names and uploads playlists for multiple channel IDs in a single API call."""
         if not channel_ids:
             return
 
@@ -52,16 +214,21 @@ class YouTubeClient(BaseMediaClient):
                 ids_param = ",".join(batch_ids)
 
                 request = self.youtube.channels().list(
-                    part="snippet",
-                    id=ids_param
+                    part="snippet,contentDetails",
+                    id=ids_param,
+                    fields=CHANNEL_FIELDS,
+                    prettyPrint=False
                 )
-                response = request.execute()
+                response = self._execute(request)
 
                 # Cache the results
                 for item in response.get("items", []):
                     channel_id = item["id"]
                     channel_name = item["snippet"]["title"]
                     self.channel_names_cache[channel_id] = channel_name
+                    uploads = item.get("contentDetails", {}).get("relatedPlaylists", {}).get("uploads")
+                    if uploads:
+                        self.upload_playlists[channel_id] = uploads
 
                 # For any channels that weren't returned, use the ID as fallback
                 returned_ids = {item["id"] for item in response.get("items", [])}
@@ -85,38 +252,165 @@ class YouTubeClient(BaseMediaClient):
         self._batch_fetch_channel_names([channel_id])
         return self.channel_names_cache.get(channel_id, channel_id)
 
+    def _get_uploads_playlist(self, channel_id):
+        """Get the channel's uploads playlist ID, deriving it from the channel ID if unknown."""
+        playlist_id = self.upload_playlists.get(channel_id)
+        if playlist_id is None:
+            # Uploads playlists mirror the channel ID: UCxxxx -> UUxxxx
+            playlist_id = "UU" + channel_id[2:]
+        return playlist_id
+
+    def _cache_path(self, playlist_id):
+        """Cache file for one uploads playlist; the API key prefix keeps accounts apart."""
+        key = f"{self.api_key[:8]}:{playlist_id}"
+        return self.cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def _prune_cache(self):
+        """Delete cache entries older than the TTL, e.g. for channels no longer configured."""
+        cutoff = time.time() - self.cache_ttl
+        try:
+            entries = list(self.cache_dir.iterdir())
+        except OSError:
+            return  # Nothing cached yet
+        for entry in entries:
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    entry.unlink()
+            except OSError:
+                pass  # Removed by another process, or not ours to remove
+
+    def _list_uploads(self, playlist_id, published_after):
+        """
+        Return the raw playlist items for an uploads playlist, newest first.
+        Pages are followed until one reaches back past published_after.
+        When caching is enabled, a listing younger than the TTL is served from disk
+        if it reaches back at least as far as published_after.
+        """
+        since_prefix = _utc_prefix(published_after)
+        cache_path = self._cache_path(playlist_id) if self.cache_ttl else None
+        if cache_path is not None:
+            try:
+                if time.time() - cache_path.stat().st_mtime < self.cache_ttl:
+                    with cache_path.open() as f:
+                        entry = json.load(f)
+                    if entry["covers"] <= since_prefix:
+                        return entry["items"]
+            except (OSError, ValueError, KeyError, TypeError):
+                pass  # Missing, unreadable or old-format entry; fall through to the API
+
+        # Cutoff prefix the listing reaches back to; "" once the whole playlist is read
+        covers = since_prefix
+        items = []
+        page_token = None
+        # Each playlistItems() call builds a new resource object, so bind the method once
+        list_page = self.youtube.playlistItems().list
+        for _ in range(MAX_UPLOAD_PAGES):
+            # A playlistItems page costs 1 quota unit; a search.list call costs 100
+            request = list_page(
+                part="snippet,contentDetails",
+                playlistId=playlist_id,
+                maxResults=50,
+                pageToken=page_token,
+                fields=PLAYLIST_ITEM_FIELDS,
+                prettyPrint=False
+            )
+            if page_token is None:
+                # The first page is unchanged whenever the channel hasn't uploaded
+                response = self._execute_conditional(request, playlist_id)
+            else:
+                response = self._execute(request)
+            page = response.get("items", [])
+            items.extend(page)
+
+            # Uploads are listed newest first, so once a page reaches back past the cutoff
+            # later pages hold nothing new. Private uploads have no publish time to check.
+            published = (item["contentDetails"].get("videoPublishedAt") for item in page)
+            if any(p and p[:19] < since_prefix for p in published):
+                break
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                covers = ""
+                break
+        else:
+            logging.warning(f"Stopped listing uploads for '{playlist_id}' after {MAX_UPLOAD_PAGES} pages")
+
+        if cache_path is not None:
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                # Write then rename so a concurrent reader never sees a partial file
+                tmp_path = cache_path.with_suffix(f".{threading.get_ident()}.tmp")
+                tmp_path.write_text(json.dumps({"covers": covers, "items": items}))
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                logging.warning(f"Failed to write YouTube cache entry {cache_path}: {e}")
+        return items
+
+    def _add_video_details(self, videos):
+        """Merge the configured video details into videos, looking up to 50 IDs per request."""
+        parts = {VIDEO_DETAILS[detail][0] for detail in self.video_details}
+        fields = ",".join(f"{part}/{field}" for part, field in map(VIDEO_DETAILS.get, self.video_details))
+        videos_by_id = {video["id"]: video for video in videos}
+        video_ids = list(videos_by_id)
+
+        list_videos = self.youtube.videos().list
+        for i in range(0, len(video_ids), 50):
+            request = list_videos(
+                part=",".join(sorted(parts)),
+                id=",".join(video_ids[i:i + 50]),
+                fields=f"items(id,{fields})",
+                prettyPrint=False
+            )
+            for item in self._execute(request).get("items", []):
+                video = videos_by_id[item["id"]]
+                for detail in self.video_details:
+                    part, field = VIDEO_DETAILS[detail]
+                    value = item.get(part, {}).get(field)
+                    # Counts come back as strings, and are missing when the owner hides them
+                    if value is not None and part == "statistics":
+                        value = int(value)
+                    video[detail] = value
+
     def _fetch_items_for_source(self, channel_id, since_datetime):
-        """Fetch videos from a specific channel."""
+        """Fetch videos from a specific channel's uploads playlist."""
         videos = []
         try:
-            published_after = since_datetime.isoformat("T").replace("+00:00", "Z")
-
             # Get channel name for friendly display
             channel_name = self._get_channel_name(channel_id)
 
-            request = self.youtube.search().list(
-                part="snippet",
-                channelId=channel_id,
-                publishedAfter=published_after,
-                maxResults=50,
-                order="date",
-                type="video"
-            )
-            response = request.execute()
-            for item in response.get("items", []):
-                video_published = item["snippet"]["publishedAt"]
+            # Older uploads are rejected by string compare, without parsing them
+            since_prefix = _utc_prefix(since_datetime)
+
+            playlist_id = self._get_uploads_playlist(channel_id)
+            for item in self._list_uploads(playlist_id, since_datetime):
+                details = item["contentDetails"]
+                # Private and deleted uploads have no publish time
+                video_published = details.get("videoPublishedAt")
+                if not video_published:
+                    continue
+                # Uploads are listed newest first, so the rest are older too. On a quiet
+                # channel this is the first dated item, and nothing else is looked at.
+                if video_published[:19] < since_prefix:
+                    break
+                # Exact check for survivors; only differs from the prefix test within the same second
                 video_datetime = datetime.fromisoformat(video_published.replace("Z", "+00:00"))
                 if video_datetime > since_datetime:
-                    video_data = {
-                        "id": item["id"]["videoId"],
+                    video_id = details["videoId"]
+                    videos.append({
+                        "id": video_id,
                         "title": item["snippet"]["title"],
-                        "url": f"https://www.youtube.com/watch?v={item['id']['videoId']}",
+                        "url": WATCH_URL_PREFIX + video_id,
                         "published_at": video_datetime,
                         "channel_id": channel_id,
                         "channel_name": channel_name
-                    }
-                    videos.append(video_data)
+                    })
         except Exception as e:
             logging.error(f"YouTube API error for channel '{channel_id}': {e}")
 
+        if videos and self.video_details:
+            try:
+                self._add_video_details(videos)
+            except Exception as e:
+                # The videos are still worth reporting without their details
+                logging.warning(f"Failed to fetch video details for channel '{channel_id}': {e}")
+
         return videos
\ No newline at end of file
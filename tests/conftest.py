@@ -0,0 +1,98 @@
+import copy
+import functools
+import sys
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+# Keep a handle on the real loader; the fixture below patches yaml.load itself
+_real_yaml_load = yaml.load
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_yaml_text(text):
+    return _real_yaml_load(text, Loader=_YAML_LOADER)
+
+
+def _cached_yaml_load(stream, Loader=None):
+    """Drop-in for yaml.load that reuses parses of identical source text."""
+    text = stream if isinstance(stream, str) else stream.read()
+    # Hand out a copy so callers that mutate the config can't poison the cache
+    return copy.deepcopy(_parse_yaml_text(text))
+
+
+@pytest.fixture
+def cached_yaml_load():
+    """Route yaml.load through an LRU cache keyed on the raw YAML text."""
+    with patch('yaml.load', side_effect=_cached_yaml_load) as mock_load:
+        yield mock_load
+
+
+class FakeSMTP:
+    """Lightweight stand-in for smtplib.SMTP_SSL that records every call.
+
+    calls holds ('connect', args), ('login', args) and ('send', (from_addr, to_addrs, msg))
+    tuples in order, and mail_options the options passed with each send. Exceptions queued in
+    send_errors are raised by successive sendmail calls; queue None for a send that should succeed.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.mail_options = []
+        self.send_errors = []
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append(('connect', args))
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def login(self, *args):
+        self.calls.append(('login', args))
+
+    def sendmail(self, from_addr, to_addrs, msg, mail_options=()):
+        self.calls.append(('send', (from_addr, to_addrs, msg)))
+        self.mail_options.append(tuple(mail_options))
+        if self.send_errors:
+            error = self.send_errors.pop(0)
+            if error is not None:
+                raise error
+
+    def calls_of(self, kind):
+        return [args for call_kind, args in self.calls if call_kind == kind]
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    """Replace smtplib.SMTP_SSL with a FakeSMTP recorder."""
+    fake = FakeSMTP()
+    monkeypatch.setattr('smtplib.SMTP_SSL', fake)
+    return fake
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--no-profile', action='store_true', default=False,
+        help='Suspend any sys.setprofile hook while each test runs (speeds up Mock-heavy tests under profilers).'
+    )
+
+
+@pytest.fixture(autouse=True)
+def _suspend_profiler(request):
+    """Temporarily clear the sys.setprofile hook when --no-profile is given."""
+    if not request.config.getoption('--no-profile'):
+        yield
+        return
+
+    saved_profile = sys.getprofile()
+    sys.setprofile(None)
+    try:
+        yield
+    finally:
+        sys.setprofile(saved_profile)
@@ -1,19 +1,126 @@
+import email
+import email.policy
+import io
+import os
+import types
 import pytest
 import yaml
 import smtplib
-from unittest.mock import Mock, patch, mock_open
+from unittest.mock import Mock, patch
 from datetime import datetime, timezone, timedelta
 from email.message import EmailMessage
 
-from main import load_config, process_source, load_smtp_settings, send_email, group_items_by_category_and_source, group_by_source, validate_config, _apply_env_overrides, format_email_content
+import main
+from main import load_config, process_source, load_smtp_settings, send_email, send_emails, group_items_by_category_and_source, group_by_source, validate_config, _apply_env_overrides, format_email_content
+
+
+FIXED_NOW = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+# Read-only configs shared across tests; copy with dict() before mutating
+CONFIGS = {
+    'empty': types.MappingProxyType({}),
+    'reddit_disabled': types.MappingProxyType({
+        'reddit': types.MappingProxyType({'enabled': False})
+    }),
+    'reddit_enabled': types.MappingProxyType({
+        'reddit': types.MappingProxyType({'enabled': True, 'subreddits': ('test',)})
+    }),
+    'youtube_enabled': types.MappingProxyType({
+        'youtube': types.MappingProxyType({'enabled': True, 'channels': ('test_channel',)})
+    }),
+    'smtp_enabled': types.MappingProxyType({
+        'smtp': types.MappingProxyType({'enabled': True, 'server': 'smtp.example.com', 'port': 587})
+    }),
+    'smtp_disabled': types.MappingProxyType({
+        'smtp': types.MappingProxyType({'enabled': False, 'server': 'smtp.example.com'})
+    }),
+    'smtp_enabled_missing': types.MappingProxyType({
+        'smtp': types.MappingProxyType({'server': 'smtp.example.com'})
+    }),
+}
+
+SMTP_CFG = types.MappingProxyType({
+    'server': 'smtp.example.com',
+    'port': 587,
+    'username': 'test@example.com',
+    'password': 'password',
+    'from': 'test@example.com',
+    'to': ['recipient@example.com']
+})
+
+SOURCE_ITEMS = [
+    {'id': '1', 'title': 'Test Post 1', 'url': 'https://example.com/1'},
+    {'id': '2', 'title': 'Test Post 2', 'url': 'https://example.com/2'}
+]
+
+EXPECTED_NO_ITEMS = ('No new items',)
+EXPECTED_WITH_ITEMS = ('Test Post', 'Test Video', 'python', 'TechChannel')
+EXPECTED_CATEGORIZED = ('News:', 'Tech:', 'worldnews', 'python', 'politics', 'News Post', 'Tech Post')
+EXPECTED_MIXED = ('REDDIT:', 'YOUTUBE:', 'worldnews', 'TechChannel', 'EduChannel', 'Reddit News', 'YouTube Tech', 'Uncategorized Video')
+
+
+def _sent_messages(fake_smtp):
+    """Parse every message the fake SMTP server received back into EmailMessage objects."""
+    return [email.message_from_bytes(raw, policy=email.policy.default) for _, _, raw in fake_smtp.calls_of('send')]
+
+
+def _plain_body(msg):
+    """Return the decoded plain-text body of an EmailMessage."""
+    return msg.get_body(preferencelist=('plain',)).get_content()
+
+
+def _logged_message(mock_log_method):
+    """Render the %-style message from the most recent call to a mocked logging method."""
+    msg, *args = mock_log_method.call_args.args
+    return msg % tuple(args) if args else msg
+
+
+def _string_open(text, opened):
+    """Build an open() replacement that serves text from memory and records its calls."""
+    def fake_open(path, mode='r'):
+        opened.append((path, mode))
+        return io.StringIO(text)
+    return fake_open
+
+
+def _fake_stat(mtime_ns=1, size=1):
+    """Patch os.stat so load_config can key its cache on a file that only exists in memory."""
+    return patch('main.os.stat', return_value=types.SimpleNamespace(st_mtime_ns=mtime_ns, st_size=size))
+
+
+@pytest.fixture(scope='session', autouse=True)
+def _prime_templates():
+    """Compile the email templates once up front so individual tests reuse them."""
+    main._get_template('email_template.txt')
+    main._get_template('email_template.html')
+
+
+@pytest.fixture(autouse=True)
+def _clear_config_cache():
+    load_config.cache_clear()
+    yield
+    load_config.cache_clear()
 
 
 class TestLoadConfig:
-    @patch('builtins.open', new_callable=mock_open, read_data='reddit:\n  enabled: true')
-    @patch('yaml.safe_load')
-    def test_load_config_success(self, mock_yaml_load, mock_file):
+    def test_load_config_success(self, cached_yaml_load):
         # Provide a complete valid configuration
-        mock_config = {
+        config_text = (
+            'reddit:\n'
+            '  enabled: true\n'
+            '  client_id: test_id\n'
+            '  client_secret: test_secret\n'
+            '  user_agent: test_agent\n'
+            '  subreddits: [test]\n'
+        )
+
+        opened = []
+        with patch('builtins.open', _string_open(config_text, opened)), _fake_stat():
+            result = load_config('config/test.yaml')
+
+        assert opened == [(os.path.abspath('config/test.yaml'), 'r')]
+        cached_yaml_load.assert_called_once()
+        assert result == {
             'reddit': {
                 'enabled': True,
                 'client_id': 'test_id',
@@ -22,20 +129,54 @@ class TestLoadConfig:
                 'subreddits': ['test']
             }
         }
-        mock_yaml_load.return_value = mock_config
-
-        result = load_config('config/test.yaml')
 
-        mock_file.assert_called_once_with('config/test.yaml', 'r')
-        mock_yaml_load.assert_called_once()
-        assert result == mock_config
-
-    def test_load_config_default_filename(self):
-        with patch('builtins.open', mock_open(read_data='test: data')) as mock_file:
-            with patch('yaml.safe_load', return_value={'test': 'data'}):
-                with patch('main.validate_config'):  # Skip validation for this test
-                    load_config()
-                    mock_file.assert_called_once_with('config/config.yaml', 'r')
+    def test_load_config_default_filename(self, cached_yaml_load):
+        opened = []
+        with patch('builtins.open', _string_open('test: data', opened)), _fake_stat():
+            with patch('main.validate_config'):  # Skip validation for this test
+                assert load_config() == {'test': 'data'}
+                assert opened == [(os.path.abspath('config/config.yaml'), 'r')]
+
+    def test_load_config_uses_libyaml_loader_when_available(self, cached_yaml_load):
+        with patch('builtins.open', _string_open('test: data', [])), _fake_stat():
+            with patch('main.validate_config'):
+                load_config()
+
+        assert cached_yaml_load.call_args.kwargs['Loader'] is main._YAML_LOADER
+        if yaml.__with_libyaml__:
+            assert main._YAML_LOADER is yaml.CSafeLoader
+        else:
+            assert main._YAML_LOADER is yaml.SafeLoader
+
+    def test_load_config_reuses_parse_for_unchanged_file(self, cached_yaml_load):
+        opened = []
+        with patch('builtins.open', _string_open('test: data', opened)), _fake_stat():
+            with patch('main.validate_config'):
+                first = load_config('same.yaml')
+                first['test'] = 'mutated'
+                second = load_config('same.yaml')
+
+        assert len(opened) == 1
+        assert second == {'test': 'data'}
+
+    def test_load_config_reparses_when_file_changes(self, cached_yaml_load):
+        opened = []
+        with patch('builtins.open', _string_open('test: data', opened)), patch('main.validate_config'):
+            with _fake_stat(mtime_ns=1):
+                load_config('same.yaml')
+            with _fake_stat(mtime_ns=2):
+                load_config('same.yaml')
+
+        assert len(opened) == 2
+
+    @pytest.mark.parametrize('config_text', [
+        pytest.param('', id='empty_file'),
+        pytest.param('- reddit\n- youtube\n', id='top_level_list'),
+    ])
+    def test_load_config_rejects_non_mapping(self, cached_yaml_load, config_text):
+        with patch('builtins.open', _string_open(config_text, [])), _fake_stat():
+            with pytest.raises(ValueError, match="Configuration must be a dictionary"):
+                load_config()
 
 
 class TestEnvironmentOverrides:
@@ -47,7 +188,7 @@ class TestEnvironmentOverrides:
             'MEDIA_MONITOR_REDDIT_ENABLED': 'true',
             'MEDIA_MONITOR_REDDIT_CLIENT_SECRET': 'secret123'
         }):
-            _apply_env_overrides(config)
+            config = _apply_env_overrides(config)
 
         assert config['reddit']['client_id'] == 'new_id'
         assert config['reddit']['enabled'] is True
@@ -61,12 +202,23 @@ class TestEnvironmentOverrides:
             'MEDIA_MONITOR_SMTP_PASSWORD': 'mypass',
             'MEDIA_MONITOR_SMTP_TO': 'user1@example.com, user2@example.com'
         }):
-            _apply_env_overrides(config)
+            config = _apply_env_overrides(config)
 
         assert config['smtp']['port'] == 587
         assert config['smtp']['password'] == 'mypass'
         assert config['smtp']['to'] == ['user1@example.com', 'user2@example.com']
 
+    @pytest.mark.parametrize('value,expected', [
+        ('a@example.com', ['a@example.com']),
+        ('  a@example.com ,b@example.com  ,  c@example.com ', ['a@example.com', 'b@example.com', 'c@example.com']),
+        ('   ', []),
+    ], ids=['single', 'padded', 'blank'])
+    def test_apply_env_overrides_smtp_to_parsing(self, value, expected):
+        with patch.dict('os.environ', {'MEDIA_MONITOR_SMTP_TO': value}):
+            config = _apply_env_overrides({})
+
+        assert config['smtp']['to'] == expected
+
     def test_apply_env_overrides_youtube_config(self):
         config = {}
 
@@ -74,7 +226,7 @@ class TestEnvironmentOverrides:
             'MEDIA_MONITOR_YOUTUBE_API_KEY': 'youtube_key_123',
             'MEDIA_MONITOR_YOUTUBE_ENABLED': '1'
         }):
-            _apply_env_overrides(config)
+            config = _apply_env_overrides(config)
 
         assert config['youtube']['api_key'] == 'youtube_key_123'
         assert config['youtube']['enabled'] is True
@@ -87,7 +239,7 @@ class TestEnvironmentOverrides:
             'MEDIA_MONITOR_YOUTUBE_ENABLED': '0',
             'MEDIA_MONITOR_SMTP_ENABLED': 'no'
         }):
-            _apply_env_overrides(config)
+            config = _apply_env_overrides(config)
 
         assert config['reddit']['enabled'] is False
         assert config['youtube']['enabled'] is False
@@ -98,11 +250,22 @@ class TestEnvironmentOverrides:
 
         with patch.dict('os.environ', {'MEDIA_MONITOR_SMTP_PORT': 'invalid_port'}):
             with patch('main.logging') as mock_logging:
-                _apply_env_overrides(config)
+                config = _apply_env_overrides(config)
                 mock_logging.warning.assert_called_once()
                 # Port should not be set due to invalid value
                 assert 'smtp' not in config or 'port' not in config.get('smtp', {})
 
+    def test_apply_env_overrides_invalid_boolean(self):
+        config = {'reddit': {'enabled': True}}
+
+        with patch.dict('os.environ', {'MEDIA_MONITOR_REDDIT_ENABLED': 'maybe'}):
+            with patch('main.logging') as mock_logging:
+                config = _apply_env_overrides(config)
+                mock_logging.warning.assert_called_once()
+
+        # Unrecognized values leave the configured setting alone
+        assert config['reddit']['enabled'] is True
+
     def test_apply_env_overrides_ignores_non_matching_vars(self):
         config = {}
 
@@ -111,7 +274,7 @@ class TestEnvironmentOverrides:
             'MEDIA_MONITOR_': 'incomplete',
             'MEDIA_MONITOR_INVALID': 'single_part'
         }):
-            _apply_env_overrides(config)
+            config = _apply_env_overrides(config)
 
         # Config should remain empty
         assert config == {}
@@ -123,15 +286,42 @@ class TestEnvironmentOverrides:
             'MEDIA_MONITOR_REDDIT_USER_AGENT': 'MyBot/1.0',
             'MEDIA_MONITOR_REDDIT_CLIENT_SECRET': 'secret'
         }):
-            _apply_env_overrides(config)
+            config = _apply_env_overrides(config)
 
         assert config['reddit']['user_agent'] == 'MyBot/1.0'
         assert config['reddit']['client_secret'] == 'secret'
 
+    def test_apply_env_overrides_leaves_input_untouched(self):
+        reddit_section = {'client_id': 'original_id', 'subreddits': ['python']}
+        youtube_section = {'api_key': 'key'}
+        config = {'reddit': reddit_section, 'youtube': youtube_section}
+
+        with patch.dict('os.environ', {'MEDIA_MONITOR_REDDIT_CLIENT_ID': 'new_id'}):
+            result = _apply_env_overrides(config)
+
+        assert result['reddit'] == {'client_id': 'new_id', 'subreddits': ['python']}
+        assert reddit_section['client_id'] == 'original_id'
+        # Sections without overrides are shared rather than copied
+        assert result['youtube'] is youtube_section
+
+    def test_apply_env_overrides_coerces_fields_for_any_service(self):
+        config = {}
+
+        with patch.dict('os.environ', {
+            'MEDIA_MONITOR_BLUESKY_ENABLED': 'yes',
+            'MEDIA_MONITOR_BLUESKY_TO': 'a, b'
+        }):
+            config = _apply_env_overrides(config)
+
+        # 'enabled' is a bool for every service, but only smtp.to is split into a list
+        assert config['bluesky']['enabled'] is True
+        assert config['bluesky']['to'] == 'a, b'
+
     @patch('main._apply_env_overrides')
-    @patch('builtins.open', new_callable=mock_open, read_data='reddit:\n  enabled: true')
-    @patch('yaml.safe_load')
-    def test_load_config_applies_env_overrides(self, mock_yaml_load, mock_file, mock_apply_env):
+    @patch('builtins.open', _string_open('reddit:\n  enabled: true', []))
+    @patch('main.os.stat', return_value=types.SimpleNamespace(st_mtime_ns=1, st_size=1))
+    @patch('yaml.load')
+    def test_load_config_applies_env_overrides(self, mock_yaml_load, mock_stat, mock_apply_env):
         mock_config = {'reddit': {'enabled': True}}
         mock_yaml_load.return_value = mock_config
 
@@ -190,6 +380,24 @@ class TestValidateConfig:
         with pytest.raises(ValueError, match="YouTube configuration must specify either 'channels' or 'categories'"):
             validate_config(config)
 
+    @pytest.mark.parametrize('config,message', [
+        (
+            {'reddit': {'enabled': True, 'client_id': 'id', 'client_secret': 'secret', 'user_agent': 'agent'}},
+            "Reddit configuration must specify either 'subreddits' or 'categories'"
+        ),
+        (
+            {'bluesky': {'enabled': True}},
+            "Bluesky configuration must specify either 'users' or 'categories'"
+        ),
+        (
+            {'smtp': {'enabled': True, 'server': 'smtp.example.com'}},
+            "SMTP configuration missing required field: port"
+        ),
+    ], ids=['reddit_sources', 'bluesky_sources', 'smtp_field'])
+    def test_validate_config_service_rules(self, config, message):
+        with pytest.raises(ValueError, match=message):
+            validate_config(config)
+
     def test_validate_config_valid_smtp(self):
         config = {
             'smtp': {
@@ -229,6 +437,11 @@ class TestValidateConfig:
         # Should not raise an exception for disabled services
         validate_config(config)
 
+    def test_validate_config_empty_sections(self):
+        # A section left empty in YAML (e.g. "smtp:" on its own) loads as None
+        config = {'reddit': None, 'youtube': None, 'bluesky': None, 'smtp': None}
+        validate_config(config)
+
 
 class TestFormatEmailContent:
     def test_format_email_content_no_items(self):
@@ -344,7 +557,8 @@ class TestFormatEmailContent:
 
     @patch('main.logging')
     def test_format_email_content_template_error_fallback(self, mock_logging):
-        # Mock template loading to fail
+        # Mock template loading to fail; drop any templates cached by earlier tests
+        main._get_template.cache_clear()
         with patch('main._setup_jinja_environment') as mock_setup:
             mock_env = Mock()
             mock_env.get_template.side_effect = Exception("Template not found")
@@ -363,6 +577,31 @@ class TestFormatEmailContent:
             # Should log the error
             mock_logging.error.assert_called_once()
 
+    @patch('main.logging')
+    def test_format_email_content_template_error_fallback_lists_titles(self, mock_logging):
+        main._get_template.cache_clear()
+        with patch('main._setup_jinja_environment') as mock_setup:
+            mock_setup.return_value.get_template.side_effect = Exception("Template not found")
+
+            plain_text, html_content = format_email_content(
+                {'reddit': [{'title': 'Fish & <Chips>'}, {}, {'title': None}, {'title': 42}]}
+            )
+
+        assert '- Fish & <Chips>' in plain_text
+        assert plain_text.count('- (no title)') == 2
+        assert '- 42' in plain_text
+        assert html_content.count('<li>(no title)</li>') == 2
+        assert '<li>Fish &amp; &lt;Chips&gt;</li>' in html_content
+
+    def test_format_email_content_reuses_compiled_templates(self):
+        main._get_template.cache_clear()
+        with patch('main._setup_jinja_environment', wraps=main._setup_jinja_environment) as mock_setup:
+            format_email_content({})
+            format_email_content({})
+
+        # One environment per template name, regardless of how many emails are rendered
+        assert mock_setup.call_count == 2
+
 
 # TestFormatServiceItems class removed - functionality moved to Jinja2 templates
 # The formatting logic is now tested via TestFormatEmailContent
@@ -370,13 +609,12 @@ class TestFormatEmailContent:
 
 class TestProcessSource:
     def setup_method(self):
-        self.mock_db_conn = Mock()
-        self.mock_client_class = Mock()
-        self.mock_client = Mock()
-        self.mock_client_class.return_value = self.mock_client
+        # spec_set stops the mocks from growing child attributes on access
+        self.mock_client = Mock(spec_set=['get_new_items_since'])
+        self.mock_client_class = Mock(spec_set=[], return_value=self.mock_client)
 
     def test_process_source_disabled(self):
-        config = {'reddit': {'enabled': False}}
+        config = CONFIGS['reddit_disabled']
 
         result = process_source('reddit', self.mock_client_class, config)
 
@@ -384,102 +622,89 @@ class TestProcessSource:
         self.mock_client_class.assert_not_called()
 
     def test_process_source_missing_config(self):
-        config = {}
+        config = CONFIGS['empty']
 
         result = process_source('reddit', self.mock_client_class, config)
 
         assert result == []
         self.mock_client_class.assert_not_called()
 
+    def test_process_source_empty_section(self):
+        result = process_source('reddit', self.mock_client_class, {'reddit': None})
+
+        assert result == []
+        self.mock_client_class.assert_not_called()
+
     @patch('main.get_last_checked')
     @patch('main.update_last_checked')
     @patch('main.datetime')
     def test_process_source_with_previous_check(self, mock_datetime, mock_update, mock_get):
-        config = {'reddit': {'enabled': True, 'subreddits': ['test']}}
+        config = CONFIGS['reddit_enabled']
         last_checked_str = '2024-01-01T12:00:00+00:00'
         mock_get.return_value = last_checked_str
 
-        mock_items = [
-            {'id': '1', 'title': 'Test Post 1', 'url': 'https://example.com/1'},
-            {'id': '2', 'title': 'Test Post 2', 'url': 'https://example.com/2'}
-        ]
-        self.mock_client.get_new_items_since.return_value = mock_items
+        self.mock_client.get_new_items_since.return_value = SOURCE_ITEMS
 
-        current_time = datetime.now(timezone.utc)
-        mock_datetime.now.return_value = current_time
+        mock_datetime.now.return_value = FIXED_NOW
         mock_datetime.fromisoformat = datetime.fromisoformat
 
         result = process_source('reddit', self.mock_client_class, config)
 
-        assert result == mock_items
+        assert result == SOURCE_ITEMS
         self.mock_client_class.assert_called_once_with(config['reddit'])
         mock_get.assert_called_once_with('reddit')
         self.mock_client.get_new_items_since.assert_called_once()
-        mock_update.assert_called_once_with('reddit', current_time)
+        mock_update.assert_called_once_with('reddit', FIXED_NOW)
 
     @patch('main.get_last_checked')
     @patch('main.update_last_checked')
     @patch('main.datetime')
     def test_process_source_no_previous_check(self, mock_datetime, mock_update, mock_get):
-        config = {'youtube': {'enabled': True, 'channels': ['test_channel']}}
+        config = CONFIGS['youtube_enabled']
         mock_get.return_value = None
 
-        mock_items = []
-        self.mock_client.get_new_items_since.return_value = mock_items
+        self.mock_client.get_new_items_since.return_value = []
 
-        current_time = datetime.now(timezone.utc)
-        default_time = current_time - timedelta(hours=72)
-        mock_datetime.now.return_value = current_time
-        mock_datetime.side_effect = lambda *args, **kwargs: datetime(*args, **kwargs) if args else current_time
+        mock_datetime.now.return_value = FIXED_NOW
 
         result = process_source('youtube', self.mock_client_class, config)
 
-        assert result == mock_items
+        assert result == []
         self.mock_client_class.assert_called_once_with(config['youtube'])
         mock_get.assert_called_once_with('youtube')
-        self.mock_client.get_new_items_since.assert_called_once()
-        mock_update.assert_called_once_with('youtube', current_time)
+        self.mock_client.get_new_items_since.assert_called_once_with(FIXED_NOW - timedelta(hours=72))
+        mock_update.assert_called_once_with('youtube', FIXED_NOW)
 
 
 class TestLoadSmtpSettings:
     def test_smtp_enabled(self):
-        config = {
-            'smtp': {
-                'enabled': True,
-                'server': 'smtp.example.com',
-                'port': 587
-            }
-        }
+        config = CONFIGS['smtp_enabled']
 
         result = load_smtp_settings(config)
 
         assert result == config['smtp']
 
     def test_smtp_disabled(self):
-        config = {
-            'smtp': {
-                'enabled': False,
-                'server': 'smtp.example.com'
-            }
-        }
+        config = CONFIGS['smtp_disabled']
 
         result = load_smtp_settings(config)
 
         assert result is None
 
     def test_smtp_missing(self):
-        config = {}
+        config = CONFIGS['empty']
 
         result = load_smtp_settings(config)
 
         assert result is None
 
+    def test_smtp_empty_section(self):
+        result = load_smtp_settings({'smtp': None})
+
+        assert result is None
+
     def test_smtp_enabled_missing(self):
-        config = {
-            'smtp': {
-                'server': 'smtp.example.com'
-            }
-        }
+        config = CONFIGS['smtp_enabled_missing']
 
         result = load_smtp_settings(config)
 
@@ -487,75 +712,71 @@ class TestLoadSmtpSettings:
 
 
 class TestSendEmail:
-    def setup_method(self):
-        self.smtp_cfg = {
-            'server': 'smtp.example.com',
-            'port': 587,
-            'username': 'test@example.com',
-            'password': 'password',
-            'from': 'test@example.com',
-            'to': ['recipient@example.com']
-        }
-
-    @patch('main.smtplib.SMTP_SSL')
-    def test_send_email_no_items(self, mock_smtp):
-        mock_server = Mock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
-
-        all_items = {}
-
-        send_email(self.smtp_cfg, all_items)
-
-        mock_smtp.assert_called_once_with('smtp.example.com', 587)
-        mock_server.login.assert_called_once_with('test@example.com', 'password')
-        mock_server.send_message.assert_called_once()
-
-        # Check that the message contains "No new items" content
-        call_args = mock_server.send_message.call_args[0][0]
-        message_str = str(call_args)
-        assert "No new items" in message_str or "No New Content" in message_str
-
-    @patch('main.smtplib.SMTP_SSL')
-    def test_send_email_with_items(self, mock_smtp):
-        mock_server = Mock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
-
-        all_items = {
-            'reddit': [
-                {'id': '1', 'title': 'Test Post', 'url': 'https://reddit.com/1', 'subreddit': 'python'}
-            ],
-            'youtube': [
-                {'id': '2', 'title': 'Test Video', 'url': 'https://youtube.com/2', 'channel_id': 'TechChannel'}
-            ]
-        }
-
-        send_email(self.smtp_cfg, all_items)
-
-        mock_smtp.assert_called_once_with('smtp.example.com', 587)
-        mock_server.login.assert_called_once_with('test@example.com', 'password')
-        mock_server.send_message.assert_called_once()
-
-        # Check that message contains the items and sources
-        call_args = mock_server.send_message.call_args[0][0]
-        message_content = str(call_args)
-        assert 'Test Post' in message_content
-        assert 'Test Video' in message_content
-        assert 'python' in message_content
-        assert 'TechChannel' in message_content
+    @pytest.mark.parametrize('all_items,expected', [
+        ({}, EXPECTED_NO_ITEMS),
+        ({'reddit': [], 'youtube': []}, EXPECTED_NO_ITEMS),
+        (
+            {
+                'reddit': [
+                    {'id': '1', 'title': 'Test Post', 'url': 'https://reddit.com/1', 'subreddit': 'python'}
+                ],
+                'youtube': [
+                    {'id': '2', 'title': 'Test Video', 'url': 'https://youtube.com/2', 'channel_id': 'TechChannel'}
+                ]
+            },
+            EXPECTED_WITH_ITEMS
+        ),
+        (
+            {
+                'reddit': [
+                    {'id': '1', 'title': 'News Post', 'url': 'https://reddit.com/1', 'category': 'news', 'subreddit': 'worldnews'},
+                    {'id': '2', 'title': 'Tech Post', 'url': 'https://reddit.com/2', 'category': 'tech', 'subreddit': 'python'},
+                    {'id': '3', 'title': 'Another News', 'url': 'https://reddit.com/3', 'category': 'news', 'subreddit': 'politics'}
+                ]
+            },
+            EXPECTED_CATEGORIZED
+        ),
+        (
+            {
+                'reddit': [
+                    {'id': '1', 'title': 'Reddit News', 'url': 'https://reddit.com/1', 'category': 'news', 'subreddit': 'worldnews'}
+                ],
+                'youtube': [
+                    {'id': '2', 'title': 'YouTube Tech', 'url': 'https://youtube.com/2', 'category': 'tech', 'channel_id': 'TechChannel'},
+                    {'id': '3', 'title': 'Uncategorized Video', 'url': 'https://youtube.com/3', 'channel_id': 'EduChannel'}
+                ]
+            },
+            EXPECTED_MIXED
+        ),
+    ], ids=['no_items', 'empty_items_list', 'with_items', 'categorized', 'mixed_sources_with_categories'])
+    def test_send_email_content(self, fake_smtp, all_items, expected):
+        send_email(SMTP_CFG, all_items)
+
+        assert fake_smtp.calls_of('connect') == [('smtp.example.com', 587)]
+        assert fake_smtp.calls_of('login') == [('test@example.com', 'password')]
+        assert fake_smtp.calls_of('send')[0][:2] == ('test@example.com', ['recipient@example.com'])
+        sent = _sent_messages(fake_smtp)
+        assert len(sent) == 1
+
+        body = _plain_body(sent[0])
+        missing = [s for s in expected if s not in body]
+        assert not missing, missing
 
     @patch('main.smtplib.SMTP_SSL')
     @patch('main.logging')
     @patch('main.time.sleep')  # Mock sleep to speed up test
-    def test_send_email_smtp_error(self, mock_sleep, mock_logging, mock_smtp):
+    @patch('main.random.uniform', return_value=0.0)  # No jitter so delays are exact
+    def test_send_email_smtp_error(self, mock_uniform, mock_sleep, mock_logging, mock_smtp):
         mock_smtp.side_effect = Exception('SMTP connection failed')
 
         all_items = {}
 
-        send_email(self.smtp_cfg, all_items)
+        send_email(SMTP_CFG, all_items)
 
         # Verify retry logic was triggered (should have 2 warning calls + 1 error call)
         assert mock_logging.warning.call_count == 2
-        mock_logging.error.assert_called_once_with('Failed to send email after 3 attempts with unexpected error: SMTP connection failed')
+        mock_logging.error.assert_called_once()
+        assert _logged_message(mock_logging.error) == 'Failed to send email after 3 attempts with unexpected error: SMTP connection failed'
 
         # Verify exponential backoff delays
         mock_sleep.assert_any_call(1.0)  # First retry: 1 second
@@ -569,16 +790,18 @@ class TestSendEmail:
 
         all_items = {}
 
-        send_email(self.smtp_cfg, all_items)
+        send_email(SMTP_CFG, all_items)
 
         # Should not retry authentication errors
         mock_logging.warning.assert_not_called()
-        mock_logging.error.assert_called_once_with('SMTP Authentication failed: (535, \'Authentication failed\')')
+        mock_logging.error.assert_called_once()
+        assert _logged_message(mock_logging.error) == 'SMTP Authentication failed: (535, \'Authentication failed\')'
 
     @patch('main.smtplib.SMTP_SSL')
     @patch('main.logging')
     @patch('main.time.sleep')
-    def test_send_email_connection_error_with_retry_success(self, mock_sleep, mock_logging, mock_smtp):
+    @patch('main.random.uniform', return_value=0.0)
+    def test_send_email_connection_error_with_retry_success(self, mock_uniform, mock_sleep, mock_logging, mock_smtp):
         # Set up mock to fail first time, succeed second time
         def side_effect(*args, **kwargs):
             if not hasattr(side_effect, 'call_count'):
@@ -598,206 +821,240 @@ class TestSendEmail:
 
         all_items = {}
 
-        send_email(self.smtp_cfg, all_items)
+        send_email(SMTP_CFG, all_items)
 
         # Should have 1 warning (first failure) and 1 success info
         mock_logging.warning.assert_called_once()
         mock_logging.info.assert_called_with('Email sent successfully.')
         mock_sleep.assert_called_once_with(1.0)  # First retry delay
 
-    @patch('main.smtplib.SMTP_SSL')
-    def test_send_email_empty_items_list(self, mock_smtp):
-        mock_server = Mock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
-
-        all_items = {
-            'reddit': [],
-            'youtube': []
-        }
+    @patch('main.smtplib.SMTP_SSL', side_effect=smtplib.SMTPConnectError(421, 'Connection failed'))
+    @patch('main.time.sleep')
+    @patch('main.random.uniform', return_value=0.5)
+    def test_send_email_retry_delay_includes_jitter(self, mock_uniform, mock_sleep, mock_smtp):
+        send_email(SMTP_CFG, {})
 
-        send_email(self.smtp_cfg, all_items)
+        mock_uniform.assert_called_with(0, 1.0)
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [1.5, 2.5]
 
-        mock_server.send_message.assert_called_once()
-        call_args = mock_server.send_message.call_args[0][0]
-        message_content = str(call_args)
-        # With new template, empty lists are treated as "no items found"
-        assert 'No new items' in message_content or 'No New Content' in message_content
+    @patch('main.smtplib.SMTP_SSL', side_effect=smtplib.SMTPConnectError(421, 'Connection failed'))
+    @patch('main.logging')
+    @patch('main.time.sleep')
+    def test_send_email_stops_retrying_at_deadline(self, mock_sleep, mock_logging, mock_smtp):
+        send_email({**SMTP_CFG, 'retry_deadline': 0}, {})
 
+        mock_smtp.assert_called_once()
+        mock_sleep.assert_not_called()
+        mock_logging.error.assert_called_once()
+        assert _logged_message(mock_logging.error) == 'Failed to send email after 1 attempts: (421, \'Connection failed\')'
 
-class TestGroupBySource:
-    def test_group_by_source_reddit(self):
-        items = [
-            {'id': '1', 'title': 'Test 1', 'subreddit': 'python'},
-            {'id': '2', 'title': 'Test 2', 'subreddit': 'python'},
-            {'id': '3', 'title': 'Test 3', 'subreddit': 'programming'}
-        ]
+    def test_send_email_renders_once_for_all_recipients(self, fake_smtp):
+        smtp_cfg = {**SMTP_CFG, 'to': ['one@example.com', 'two@example.com', 'three@example.com']}
 
-        result = group_by_source(items)
+        with patch('main.format_email_content', wraps=format_email_content) as mock_format:
+            send_email(smtp_cfg, {})
 
-        expected = {
-            'python': [
-                {'id': '1', 'title': 'Test 1', 'subreddit': 'python'},
-                {'id': '2', 'title': 'Test 2', 'subreddit': 'python'}
-            ],
-            'programming': [
-                {'id': '3', 'title': 'Test 3', 'subreddit': 'programming'}
-            ]
-        }
-        assert result == expected
+        mock_format.assert_called_once()
+        sent = _sent_messages(fake_smtp)
+        assert len(sent) == 1
+        assert sent[0]['To'] == 'one@example.com, two@example.com, three@example.com'
 
-    def test_group_by_source_youtube(self):
-        items = [
-            {'id': '1', 'title': 'Video 1', 'channel_id': 'UC123', 'channel_name': 'TechChannel'},
-            {'id': '2', 'title': 'Video 2', 'channel_id': 'UC456', 'channel_name': 'EduChannel'}
-        ]
+    def test_send_email_ascii_addresses_use_plain_smtp(self, fake_smtp):
+        send_email(SMTP_CFG, {})
 
-        result = group_by_source(items)
+        assert fake_smtp.mail_options == [()]
 
-        expected = {
-            'TechChannel': [{'id': '1', 'title': 'Video 1', 'channel_id': 'UC123', 'channel_name': 'TechChannel'}],
-            'EduChannel': [{'id': '2', 'title': 'Video 2', 'channel_id': 'UC456', 'channel_name': 'EduChannel'}]
-        }
-        assert result == expected
+    def test_send_email_non_ascii_addresses_use_smtputf8(self, fake_smtp):
+        smtp_cfg = {**SMTP_CFG, 'from': 'rapport@exämple.com', 'to': ['zoë@example.com']}
 
-    def test_group_by_source_unknown(self):
-        items = [
-            {'id': '1', 'title': 'Test Item'}
-        ]
+        send_email(smtp_cfg, {})
 
-        result = group_by_source(items)
+        assert fake_smtp.mail_options == [('SMTPUTF8', 'BODY=8BITMIME')]
+        raw = fake_smtp.calls_of('send')[0][2]
+        # Addresses are written as raw UTF-8 rather than failing to encode
+        assert 'To: zoë@example.com'.encode() in raw
+        assert 'From: rapport@exämple.com'.encode() in raw
 
-        expected = {
-            'unknown': [{'id': '1', 'title': 'Test Item'}]
-        }
-        assert result == expected
+    def test_send_emails_reuses_connection(self, fake_smtp):
+        send_emails(SMTP_CFG, [{}, {'reddit': []}, {'youtube': []}])
 
+        assert fake_smtp.calls_of('connect') == [('smtp.example.com', 587)]
+        assert fake_smtp.calls_of('login') == [('test@example.com', 'password')]
+        assert len(fake_smtp.calls_of('send')) == 3
 
-class TestGroupItemsByCategoryAndSource:
-    def test_group_items_no_categories(self):
-        items = [
-            {'id': '1', 'title': 'Test 1', 'subreddit': 'python'},
-            {'id': '2', 'title': 'Test 2', 'subreddit': 'programming'}
-        ]
-
-        result = group_items_by_category_and_source(items)
-
-        expected = {
-            'uncategorized': {
-                'python': [{'id': '1', 'title': 'Test 1', 'subreddit': 'python'}],
-                'programming': [{'id': '2', 'title': 'Test 2', 'subreddit': 'programming'}]
-            }
-        }
-        assert result == expected
+    @patch('main.time.sleep')
+    def test_send_emails_resumes_after_disconnect(self, mock_sleep, fake_smtp):
+        fake_smtp.send_errors = [None, smtplib.SMTPServerDisconnected('dropped')]
 
-    def test_group_items_with_categories(self):
-        items = [
-            {'id': '1', 'title': 'News Item', 'category': 'news', 'subreddit': 'worldnews'},
-            {'id': '2', 'title': 'Tech Item', 'category': 'tech', 'subreddit': 'python'},
-            {'id': '3', 'title': 'Another News', 'category': 'news', 'subreddit': 'politics'}
-        ]
+        send_emails(SMTP_CFG, [{}, {}, {}])
 
-        result = group_items_by_category_and_source(items)
+        # Reconnects once and does not resend the message that already went out
+        assert len(fake_smtp.calls_of('connect')) == 2
+        sent = fake_smtp.calls_of('send')
+        assert len(sent) == 4
+        # The retry resends the exact bytes serialized before the first attempt
+        assert sent[1][2] is sent[2][2]
+        assert sent[0][2] is not sent[1][2]
 
-        expected = {
-            'news': {
-                'worldnews': [{'id': '1', 'title': 'News Item', 'category': 'news', 'subreddit': 'worldnews'}],
-                'politics': [{'id': '3', 'title': 'Another News', 'category': 'news', 'subreddit': 'politics'}]
-            },
-            'tech': {
-                'python': [{'id': '2', 'title': 'Tech Item', 'category': 'tech', 'subreddit': 'python'}]
-            }
-        }
-        assert result == expected
+    @patch('main.time.sleep')
+    @patch('main.logging')
+    def test_send_emails_skips_rejected_message_without_reconnecting(self, mock_logging, mock_sleep, fake_smtp):
+        fake_smtp.send_errors = [None, smtplib.SMTPDataError(554, 'Message content rejected')]
 
-    def test_group_items_mixed_categorization(self):
-        items = [
-            {'id': '1', 'title': 'Categorized', 'category': 'news', 'subreddit': 'worldnews'},
-            {'id': '2', 'title': 'Uncategorized', 'subreddit': 'python'}
-        ]
+        result = main._send_messages_with_retry(SMTP_CFG, [main._build_message(SMTP_CFG, {}) for _ in range(3)])
 
-        result = group_items_by_category_and_source(items)
+        # The rejected message is neither resent nor a reason to reconnect; the next one still goes out
+        assert result is False
+        assert len(fake_smtp.calls_of('connect')) == 1
+        assert len(fake_smtp.calls_of('send')) == 3
+        mock_sleep.assert_not_called()
+        mock_logging.error.assert_called_once()
+        assert _logged_message(mock_logging.error) == "SMTP server rejected message 2 of 3: (554, 'Message content rejected')"
 
-        expected = {
-            'news': {
-                'worldnews': [{'id': '1', 'title': 'Categorized', 'category': 'news', 'subreddit': 'worldnews'}]
-            },
-            'uncategorized': {
-                'python': [{'id': '2', 'title': 'Uncategorized', 'subreddit': 'python'}]
-            }
-        }
-        assert result == expected
+    @patch('main.time.sleep')
+    def test_send_email_builds_and_serializes_once_across_retries(self, mock_sleep, fake_smtp):
+        fake_smtp.send_errors = [smtplib.SMTPServerDisconnected('dropped')]
 
-    def test_group_items_empty_list(self):
-        result = group_items_by_category_and_source([])
-        assert result == {}
+        with patch('main._build_message', wraps=main._build_message) as mock_build, \
+                patch('main._serialize_message', wraps=main._serialize_message) as mock_serialize:
+            send_email(SMTP_CFG, {})
 
+        assert len(fake_smtp.calls_of('connect')) == 2
+        mock_build.assert_called_once()
+        mock_serialize.assert_called_once()
 
-class TestSendEmailWithCategories:
-    def setup_method(self):
-        self.smtp_cfg = {
-            'server': 'smtp.example.com',
-            'port': 587,
-            'username': 'test@example.com',
-            'password': 'password',
-            'from': 'test@example.com',
-            'to': ['recipient@example.com']
-        }
+    @pytest.mark.parametrize('all_items', [{}, {'reddit': [], 'youtube': []}], ids=['no_items', 'empty_items_list'])
+    def test_send_email_skips_empty_report_when_send_empty_disabled(self, fake_smtp, all_items):
+        send_email({**SMTP_CFG, 'send_empty': False}, all_items)
 
-    @patch('main.smtplib.SMTP_SSL')
-    def test_send_email_with_categorized_items(self, mock_smtp):
-        mock_server = Mock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
+        assert fake_smtp.calls == []
 
-        all_items = {
-            'reddit': [
-                {'id': '1', 'title': 'News Post', 'url': 'https://reddit.com/1', 'category': 'news', 'subreddit': 'worldnews'},
-                {'id': '2', 'title': 'Tech Post', 'url': 'https://reddit.com/2', 'category': 'tech', 'subreddit': 'python'},
-                {'id': '3', 'title': 'Another News', 'url': 'https://reddit.com/3', 'category': 'news', 'subreddit': 'politics'}
-            ]
-        }
+    def test_send_email_send_empty_disabled_still_sends_items(self, fake_smtp):
+        send_email({**SMTP_CFG, 'send_empty': False}, {'reddit': [{'id': '1', 'title': 'Test Post', 'url': 'https://reddit.com/1', 'subreddit': 'python'}]})
 
-        send_email(self.smtp_cfg, all_items)
+        assert len(fake_smtp.calls_of('send')) == 1
 
-        mock_smtp.assert_called_once_with('smtp.example.com', 587)
-        mock_server.login.assert_called_once_with('test@example.com', 'password')
-        mock_server.send_message.assert_called_once()
+    def test_send_emails_no_batches(self, fake_smtp):
+        send_emails(SMTP_CFG, [])
 
-        # Check that message contains category and source groupings
-        call_args = mock_server.send_message.call_args[0][0]
-        message_content = str(call_args)
-        assert 'News:' in message_content
-        assert 'Tech:' in message_content
-        assert 'worldnews' in message_content
-        assert 'python' in message_content
-        assert 'politics' in message_content
-        assert 'News Post' in message_content
-        assert 'Tech Post' in message_content
+        assert fake_smtp.calls == []
 
-    @patch('main.smtplib.SMTP_SSL')
-    def test_send_email_mixed_sources_with_categories(self, mock_smtp):
-        mock_server = Mock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
 
-        all_items = {
-            'reddit': [
-                {'id': '1', 'title': 'Reddit News', 'url': 'https://reddit.com/1', 'category': 'news', 'subreddit': 'worldnews'}
+class TestGroupBySource:
+    @pytest.mark.parametrize('items,expected', [
+        (
+            [
+                {'id': '1', 'title': 'Test 1', 'subreddit': 'python'},
+                {'id': '2', 'title': 'Test 2', 'subreddit': 'python'},
+                {'id': '3', 'title': 'Test 3', 'subreddit': 'programming'}
             ],
-            'youtube': [
-                {'id': '2', 'title': 'YouTube Tech', 'url': 'https://youtube.com/2', 'category': 'tech', 'channel_id': 'TechChannel'},
-                {'id': '3', 'title': 'Uncategorized Video', 'url': 'https://youtube.com/3', 'channel_id': 'EduChannel'}
-            ]
-        }
+            {
+                'python': [
+                    {'id': '1', 'title': 'Test 1', 'subreddit': 'python'},
+                    {'id': '2', 'title': 'Test 2', 'subreddit': 'python'}
+                ],
+                'programming': [
+                    {'id': '3', 'title': 'Test 3', 'subreddit': 'programming'}
+                ]
+            }
+        ),
+        (
+            [
+                {'id': '1', 'title': 'Video 1', 'channel_id': 'UC123', 'channel_name': 'TechChannel'},
+                {'id': '2', 'title': 'Video 2', 'channel_id': 'UC456', 'channel_name': 'EduChannel'}
+            ],
+            {
+                'TechChannel': [{'id': '1', 'title': 'Video 1', 'channel_id': 'UC123', 'channel_name': 'TechChannel'}],
+                'EduChannel': [{'id': '2', 'title': 'Video 2', 'channel_id': 'UC456', 'channel_name': 'EduChannel'}]
+            }
+        ),
+        (
+            [{'id': '1', 'title': 'Test Item'}],
+            {'unknown': [{'id': '1', 'title': 'Test Item'}]}
+        ),
+    ], ids=['reddit', 'youtube', 'unknown'])
+    def test_group_by_source(self, items, expected):
+        assert group_by_source(items) == expected
+
 
-        send_email(self.smtp_cfg, all_items)
-
-        call_args = mock_server.send_message.call_args[0][0]
-        message_content = str(call_args)
-        # Template uses uppercase service names in text format
-        assert 'REDDIT:' in message_content or 'Reddit' in message_content
-        assert 'YOUTUBE:' in message_content or 'Youtube' in message_content
-        assert 'worldnews' in message_content
-        assert 'TechChannel' in message_content
-        assert 'EduChannel' in message_content
-        assert 'Reddit News' in message_content
-        assert 'YouTube Tech' in message_content
-        assert 'Uncategorized Video' in message_content
+class TestGroupItemsByCategoryAndSource:
+    @pytest.mark.parametrize('items,expected', [
+        (
+            [
+                {'id': '1', 'title': 'Test 1', 'subreddit': 'python'},
+                {'id': '2', 'title': 'Test 2', 'subreddit': 'programming'}
+            ],
+            {
+                'uncategorized': {
+                    'python': [{'id': '1', 'title': 'Test 1', 'subreddit': 'python'}],
+                    'programming': [{'id': '2', 'title': 'Test 2', 'subreddit': 'programming'}]
+                }
+            }
+        ),
+        (
+            [
+                {'id': '1', 'title': 'News Item', 'category': 'news', 'subreddit': 'worldnews'},
+                {'id': '2', 'title': 'Tech Item', 'category': 'tech', 'subreddit': 'python'},
+                {'id': '3', 'title': 'Another News', 'category': 'news', 'subreddit': 'politics'}
+            ],
+            {
+                'news': {
+                    'worldnews': [{'id': '1', 'title': 'News Item', 'category': 'news', 'subreddit': 'worldnews'}],
+                    'politics': [{'id': '3', 'title': 'Another News', 'category': 'news', 'subreddit': 'politics'}]
+                },
+                'tech': {
+                    'python': [{'id': '2', 'title': 'Tech Item', 'category': 'tech', 'subreddit': 'python'}]
+                }
+            }
+        ),
+        (
+            [
+                {'id': '1', 'title': 'Categorized', 'category': 'news', 'subreddit': 'worldnews'},
+                {'id': '2', 'title': 'Uncategorized', 'subreddit': 'python'}
+            ],
+            {
+                'news': {
+                    'worldnews': [{'id': '1', 'title': 'Categorized', 'category': 'news', 'subreddit': 'worldnews'}]
+                },
+                'uncategorized': {
+                    'python': [{'id': '2', 'title': 'Uncategorized', 'subreddit': 'python'}]
+                }
+            }
+        ),
+        (
+            [
+                {'id': '1', 'title': 'Categorized', 'category': 'news', 'subreddit': 'worldnews'},
+                {'id': '2', 'title': 'None Category', 'category': None, 'subreddit': 'python'},
+                {'id': '3', 'title': 'Empty Category', 'category': '', 'subreddit': 'python'}
+            ],
+            {
+                'news': {
+                    'worldnews': [{'id': '1', 'title': 'Categorized', 'category': 'news', 'subreddit': 'worldnews'}]
+                },
+                None: {
+                    'python': [{'id': '2', 'title': 'None Category', 'category': None, 'subreddit': 'python'}]
+                },
+                '': {
+                    'python': [{'id': '3', 'title': 'Empty Category', 'category': '', 'subreddit': 'python'}]
+                }
+            }
+        ),
+        (
+            [
+                {'id': '1', 'title': 'None Category', 'category': None, 'subreddit': 'python'},
+                {'id': '2', 'title': 'Empty Category', 'category': '', 'subreddit': 'python'}
+            ],
+            {
+                'uncategorized': {
+                    'python': [
+                        {'id': '1', 'title': 'None Category', 'category': None, 'subreddit': 'python'},
+                        {'id': '2', 'title': 'Empty Category', 'category': '', 'subreddit': 'python'}
+                    ]
+                }
+            }
+        ),
+        ([], {}),
+    ], ids=['no_categories', 'with_categories', 'mixed_categorization', 'mixed_falsy_categories',
+            'only_falsy_categories', 'empty_list'])
+    def test_group_items_by_category_and_source(self, items, expected):
+        assert group_items_by_category_and_source(items) == expected
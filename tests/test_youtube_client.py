@@ -1,51 +1,123 @@
-from unittest.mock import Mock, patch
-from datetime import datetime, timezone
+import os
+import threading
+from unittest.mock import ANY, Mock
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 
+import pytest
+from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
+
+from src import youtube_client
 from src.youtube_client import YouTubeClient
 
+# Fixed cutoff shared by the fetch tests; video timestamps below are relative to it
+SINCE = datetime(2024, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+
+
+def upload(video_id, title, published_at):
+    """A playlistItems entry for one upload; private uploads have no published_at."""
+    details = {"videoId": video_id}
+    if published_at:
+        details["videoPublishedAt"] = published_at
+    return {"snippet": {"title": title}, "contentDetails": details}
+
+
+# Canned API payloads, built once and handed out by reference
+EMPTY_RESPONSE = {"items": []}
+CHANNEL_ITEMS = {
+    "UC123": {
+        "id": "UC123",
+        "snippet": {"title": "TechChannel"},
+        "contentDetails": {"relatedPlaylists": {"uploads": "UU123"}}
+    },
+    "UC456": {
+        "id": "UC456",
+        "snippet": {"title": "EduChannel"},
+        "contentDetails": {"relatedPlaylists": {"uploads": "UU456"}}
+    },
+}
+# Keyed by uploads playlist ID
+PLAYLIST_RESPONSES = {
+    "UU123": {"items": [upload("tech_video", "Tech Video", "2024-01-02T12:00:00Z")]},
+    "UU456": {"items": [upload("edu_video", "Education Video", "2024-01-02T12:00:00Z")]},
+}
+
+
+def api_response(data):
+    """Stand-in for a googleapiclient request whose execute() returns data."""
+    return SimpleNamespace(execute=lambda **kwargs: data)
+
 
 class TestYouTubeClient:
-    def setup_method(self):
-        self.config = {
-            "api_key": "test_api_key",
-            "channels": ["UC123", "UC456"]
-        }
-        self.categorized_config = {
-            "api_key": "test_api_key",
-            "categories": {
-                "tech": ["UC123"],
-                "education": ["UC456"]
-            }
+    config = {
+        "api_key": "test_api_key",
+        "channels": ["UC123", "UC456"]
+    }
+    categorized_config = {
+        "api_key": "test_api_key",
+        "categories": {
+            "tech": ["UC123"],
+            "education": ["UC456"]
         }
+    }
 
-    @patch('src.youtube_client.build')
-    def test_init_simple_config(self, mock_build):
+    @pytest.fixture
+    def mock_youtube(self, monkeypatch):
+        """Stub build() for one test and return the YouTube service it hands out."""
         mock_youtube = Mock()
-        mock_build.return_value = mock_youtube
-
+        channels_list = mock_youtube.channels.return_value.list
+        channels_list.return_value.execute.return_value = {"items": []}
+        monkeypatch.setattr(youtube_client, 'build', Mock(return_value=mock_youtube))
+        # Drop services built by earlier tests so this one gets the fresh mock
+        youtube_client._build_service.cache_clear()
+        return mock_youtube
+
+    @pytest.fixture
+    def seeded_client(self, mock_youtube):
+        """A client with channel names already cached, for tests that skip the lookup."""
         client = YouTubeClient(self.config)
+        client.channel_names_cache.update({"UC123": "TechChannel", "UC456": "EduChannel"})
+        return client
+
+    @pytest.mark.parametrize("config, expected_channels, expected_categories", [
+        pytest.param(config, ["UC123", "UC456"], None, id="simple_config"),
+        pytest.param(
+            categorized_config,
+            ["UC123", "UC456"],
+            {"tech": ["UC123"], "education": ["UC456"]},
+            id="categorized_config"
+        ),
+    ])
+    def test_init(self, mock_youtube, config, expected_channels, expected_categories):
+        client = YouTubeClient(config)
 
         assert client.api_key == "test_api_key"
-        assert client.channels == ["UC123", "UC456"]
+        assert client.channels == expected_channels
+        assert client.categories == expected_categories
         assert client.channel_names_cache == {}
-        mock_build.assert_called_once_with("youtube", "v3", developerKey="test_api_key")
 
-    @patch('src.youtube_client.build')
-    def test_init_categorized_config(self, mock_build):
-        mock_youtube = Mock()
-        mock_build.return_value = mock_youtube
+    def test_init_builds_youtube_service(self, mock_youtube):
+        client = YouTubeClient(self.config)
 
-        client = YouTubeClient(self.categorized_config)
+        youtube_client.build.assert_called_once_with(
+            "youtube", "v3", developerKey="test_api_key", model=ANY, static_discovery=True, cache_discovery=False
+        )
+        assert client.youtube is mock_youtube
 
-        assert client.api_key == "test_api_key"
-        assert set(client.channels) == {"UC123", "UC456"}
-        assert client.categories == {"tech": ["UC123"], "education": ["UC456"]}
+    def test_service_decodes_with_orjson(self, mock_youtube):
+        YouTubeClient(self.config)
 
-    @patch('src.youtube_client.build')
-    def test_get_channel_name_cache_hit(self, mock_build):
-        mock_youtube = Mock()
-        mock_build.return_value = mock_youtube
+        assert isinstance(youtube_client.build.call_args.kwargs['model'], youtube_client._OrjsonModel)
+
+    def test_clients_share_youtube_service(self, mock_youtube):
+        first = YouTubeClient(self.config)
+        second = YouTubeClient(self.categorized_config)
 
+        assert second.youtube is first.youtube
+        youtube_client.build.assert_called_once()
+
+    def test_get_channel_name_cache_hit(self, mock_youtube):
         client = YouTubeClient(self.config)
         client.channel_names_cache["UC123"] = "TechChannel"
 
@@ -55,14 +127,9 @@ class TestYouTubeClient:
         # Should not make API call when cache hit
         mock_youtube.channels.assert_not_called()
 
-    @patch('src.youtube_client.build')
-    def test_get_channel_name_api_success(self, mock_build):
-        mock_youtube = Mock()
-        mock_build.return_value = mock_youtube
-
+    def test_get_channel_name_api_success(self, mock_youtube):
         # Mock API response
-        mock_request = Mock()
-        mock_youtube.channels.return_value.list.return_value = mock_request
+        mock_request = mock_youtube.channels.return_value.list.return_value
         mock_request.execute.return_value = {
             "items": [
                 {
@@ -80,18 +147,15 @@ class TestYouTubeClient:
         assert result == "TechChannel"
         assert client.channel_names_cache["UC123"] == "TechChannel"
         mock_youtube.channels.return_value.list.assert_called_once_with(
-            part="snippet",
-            id="UC123"
+            part="snippet,contentDetails",
+            id="UC123",
+            fields=youtube_client.CHANNEL_FIELDS,
+            prettyPrint=False
         )
 
-    @patch('src.youtube_client.build')
-    def test_get_channel_name_api_failure(self, mock_build):
-        mock_youtube = Mock()
-        mock_build.return_value = mock_youtube
-
+    def test_get_channel_name_api_failure(self, mock_youtube):
         # Mock API failure
-        mock_request = Mock()
-        mock_youtube.channels.return_value.list.return_value = mock_request
+        mock_request = mock_youtube.channels.return_value.list.return_value
         mock_request.execute.side_effect = Exception("API Error")
 
         client = YouTubeClient(self.config)
@@ -101,16 +165,8 @@ class TestYouTubeClient:
         assert result == "UC123"
         assert client.channel_names_cache["UC123"] == "UC123"
 
-    @patch('src.youtube_client.build')
-    def test_get_channel_name_no_items(self, mock_build):
-        mock_youtube = Mock()
-        mock_build.return_value = mock_youtube
-
-        # Mock API response with no items
-        mock_request = Mock()
-        mock_youtube.channels.return_value.list.return_value = mock_request
-        mock_request.execute.return_value = {"items": []}
-
+    def test_get_channel_name_no_items(self, mock_youtube):
+        # The fixture's channel lookup returns no items by default
         client = YouTubeClient(self.config)
         result = client._get_channel_name("UC123")
 
@@ -118,14 +174,9 @@ class TestYouTubeClient:
         assert result == "UC123"
         assert client.channel_names_cache["UC123"] == "UC123"
 
-    @patch('src.youtube_client.build')
-    def test_fetch_items_for_source_with_channel_names(self, mock_build):
-        mock_youtube = Mock()
-        mock_build.return_value = mock_youtube
-
+    def test_fetch_items_for_source_with_channel_names(self, mock_youtube):
         # Mock channel name lookup
-        mock_request = Mock()
-        mock_youtube.channels.return_value.list.return_value = mock_request
+        mock_request = mock_youtube.channels.return_value.list.return_value
         mock_request.execute.return_value = {
             "items": [
                 {
@@ -137,23 +188,14 @@ class TestYouTubeClient:
             ]
         }
 
-        # Mock search API response
-        search_request = Mock()
-        mock_youtube.search.return_value.list.return_value = search_request
-        search_request.execute.return_value = {
-            "items": [
-                {
-                    "id": {"videoId": "video123"},
-                    "snippet": {
-                        "title": "Test Video",
-                        "publishedAt": "2024-01-02T12:00:00Z"
-                    }
-                }
-            ]
+        # Mock uploads playlist response
+        playlist_request = mock_youtube.playlistItems.return_value.list.return_value
+        playlist_request.execute.return_value = {
+            "items": [upload("video123", "Test Video", "2024-01-02T12:00:00Z")]
         }
 
         client = YouTubeClient(self.config)
-        since_datetime = datetime(2024, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+        since_datetime = SINCE
 
         result = client._fetch_items_for_source("UC123", since_datetime)
 
@@ -168,111 +210,207 @@ class TestYouTubeClient:
 
         # Verify channel name was fetched
         mock_youtube.channels.return_value.list.assert_called_once_with(
-            part="snippet",
-            id="UC123"
+            part="snippet,contentDetails",
+            id="UC123",
+            fields=youtube_client.CHANNEL_FIELDS,
+            prettyPrint=False
+        )
+        # No uploads playlist came back with the lookup, so it is derived from the ID
+        mock_youtube.playlistItems.return_value.list.assert_called_once_with(
+            part="snippet,contentDetails",
+            playlistId="UU123",
+            maxResults=50,
+            pageToken=None,
+            fields=youtube_client.PLAYLIST_ITEM_FIELDS,
+            prettyPrint=False
         )
 
-    @patch('src.youtube_client.build')
-    def test_fetch_items_filters_by_datetime(self, mock_build):
-        mock_youtube = Mock()
-        mock_build.return_value = mock_youtube
-
-        # Mock channel name lookup
-        mock_request = Mock()
-        mock_youtube.channels.return_value.list.return_value = mock_request
-        mock_request.execute.return_value = {
-            "items": [{"snippet": {"title": "TechChannel"}}]
-        }
-
-        # Mock search API response with videos before and after the since_datetime
-        search_request = Mock()
-        mock_youtube.search.return_value.list.return_value = search_request
-        search_request.execute.return_value = {
+    def test_fetch_items_filters_by_datetime(self, mock_youtube, seeded_client):
+        # Mock uploads with videos before and after the since_datetime
+        playlist_request = mock_youtube.playlistItems.return_value.list.return_value
+        playlist_request.execute.return_value = {
             "items": [
-                {
-                    "id": {"videoId": "old_video"},
-                    "snippet": {
-                        "title": "Old Video",
-                        "publishedAt": "2024-01-01T10:00:00Z"  # Before since_datetime
-                    }
-                },
-                {
-                    "id": {"videoId": "new_video"},
-                    "snippet": {
-                        "title": "New Video",
-                        "publishedAt": "2024-01-02T12:00:00Z"  # After since_datetime
-                    }
-                }
+                upload("private_video", "Private video", None),  # Skipped: no publish time
+                upload("new_video", "New Video", "2024-01-02T12:00:00Z"),  # After since_datetime
+                upload("old_video", "Old Video", "2024-01-01T10:00:00Z"),  # Before since_datetime
             ]
         }
 
-        client = YouTubeClient(self.config)
-        since_datetime = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        since_datetime = SINCE + timedelta(hours=12)
 
-        result = client._fetch_items_for_source("UC123", since_datetime)
+        result = seeded_client._fetch_items_for_source("UC123", since_datetime)
 
         # Should only return the video after since_datetime
         assert len(result) == 1
         assert result[0]["id"] == "new_video"
         assert result[0]["title"] == "New Video"
+        assert result[0]["channel_name"] == "TechChannel"
+        mock_youtube.channels.assert_not_called()
 
-    @patch('src.youtube_client.build')
-    def test_get_new_items_since_with_categories(self, mock_build):
-        mock_youtube = Mock()
-        mock_build.return_value = mock_youtube
+    def test_fetch_items_stops_at_first_older_upload(self, mock_youtube, seeded_client, caplog):
+        playlist_request = mock_youtube.playlistItems.return_value.list.return_value
+        playlist_request.execute.return_value = {
+            "items": [
+                upload("old_video", "Old Video", "2023-12-31T12:00:00Z"),
+                # Never reached: an entry this malformed would raise if it were read
+                {"contentDetails": {"videoPublishedAt": "2024-01-02T12:00:00Z"}},
+            ]
+        }
+
+        result = seeded_client._fetch_items_for_source("UC123", SINCE)
+
+        assert result == []
+        assert caplog.records == []
+
+    def test_fetch_items_compares_within_the_same_second(self, mock_youtube, seeded_client):
+        playlist_request = mock_youtube.playlistItems.return_value.list.return_value
+        playlist_request.execute.return_value = {
+            "items": [
+                upload("same_second", "Same Second", "2024-01-01T12:00:00Z"),
+                upload("next_second", "Next Second", "2024-01-01T12:00:01Z"),
+            ]
+        }
+
+        # The cutoff falls partway through the first video's second
+        since_datetime = SINCE + timedelta(hours=12, microseconds=500000)
+
+        result = seeded_client._fetch_items_for_source("UC123", since_datetime)
+
+        assert [video["id"] for video in result] == ["next_second"]
+
+    def test_fetch_items_follows_pages_until_cutoff(self, mock_youtube, seeded_client):
+        pages = {
+            None: {"items": [upload("newest", "Newest", "2024-01-03T12:00:00Z")], "nextPageToken": "page2"},
+            "page2": {
+                "items": [
+                    upload("newer", "Newer", "2024-01-02T12:00:00Z"),
+                    upload("older", "Older", "2023-12-31T12:00:00Z"),
+                ],
+                "nextPageToken": "page3"
+            },
+        }
+        playlist_list = mock_youtube.playlistItems.return_value.list
+        playlist_list.side_effect = lambda **kwargs: api_response(pages[kwargs['pageToken']])
+
+        result = seeded_client._fetch_items_for_source("UC123", SINCE)
+
+        assert [video["id"] for video in result] == ["newest", "newer"]
+        # page2 already reaches back past the cutoff, so page3 is never requested
+        assert [call.kwargs['pageToken'] for call in playlist_list.call_args_list] == [None, "page2"]
+
+    def test_fetch_items_stops_at_page_cap(self, mock_youtube, seeded_client, monkeypatch, caplog):
+        monkeypatch.setattr(youtube_client, 'MAX_UPLOAD_PAGES', 2)
+        playlist_request = mock_youtube.playlistItems.return_value.list.return_value
+        playlist_request.execute.return_value = {
+            "items": [upload("new_video", "New Video", "2024-01-02T12:00:00Z")],
+            "nextPageToken": "more"
+        }
+
+        result = seeded_client._fetch_items_for_source("UC123", SINCE)
+
+        assert len(result) == 2
+        assert playlist_request.execute.call_count == 2
+        assert "after 2 pages" in caplog.text
+
+    def test_fetch_items_revalidates_first_page_with_etag(self, mock_youtube, seeded_client):
+        playlist_request = mock_youtube.playlistItems.return_value.list.return_value
+        playlist_request.headers = {}
+        playlist_request.execute.side_effect = [
+            {"etag": "v1", **PLAYLIST_RESPONSES["UU123"]},
+            HttpError(SimpleNamespace(status=304, reason="Not Modified"), b""),
+        ]
+
+        first = seeded_client._list_uploads("UU123", SINCE)
+        second = seeded_client._list_uploads("UU123", SINCE)
+
+        assert second == first == PLAYLIST_RESPONSES["UU123"]["items"]
+        assert playlist_request.headers == {"If-None-Match": "v1"}
+
+    def test_fetch_items_stores_changed_page_after_revalidation(self, mock_youtube, seeded_client):
+        playlist_request = mock_youtube.playlistItems.return_value.list.return_value
+        playlist_request.headers = {}
+        playlist_request.execute.side_effect = [
+            {"etag": "v1", "items": []},
+            {"etag": "v2", **PLAYLIST_RESPONSES["UU123"]},
+        ]
 
+        assert seeded_client._fetch_items_for_source("UC123", SINCE) == []
+        result = seeded_client._fetch_items_for_source("UC123", SINCE)
+
+        assert [video["id"] for video in result] == ["tech_video"]
+        assert seeded_client.etag_responses["UU123"]["etag"] == "v2"
+
+    def test_fetch_items_skips_video_details_by_default(self, mock_youtube, seeded_client):
+        playlist_request = mock_youtube.playlistItems.return_value.list.return_value
+        playlist_request.execute.return_value = PLAYLIST_RESPONSES["UU123"]
+
+        result = seeded_client._fetch_items_for_source("UC123", SINCE)
+
+        assert "duration" not in result[0]
+        mock_youtube.videos.assert_not_called()
+
+    def test_fetch_items_adds_video_details_in_batches(self, mock_youtube):
+        client = YouTubeClient({**self.config, "video_details": ["duration", "view_count", "likes"]})
+        client.channel_names_cache["UC123"] = "TechChannel"
+        uploads = [upload(f"video{i}", f"Video {i}", "2024-01-02T12:00:00Z") for i in range(60)]
+        mock_youtube.playlistItems.return_value.list.return_value.execute.return_value = {"items": uploads}
+
+        def mock_videos_response(**kwargs):
+            return api_response({"items": [
+                {"id": video_id, "contentDetails": {"duration": "PT4M13S"}, "statistics": {"viewCount": "1024"}}
+                for video_id in kwargs['id'].split(",")
+            ]})
+
+        videos_list = mock_youtube.videos.return_value.list
+        videos_list.side_effect = mock_videos_response
+
+        result = client._fetch_items_for_source("UC123", SINCE)
+
+        assert client.video_details == ["duration", "view_count"]
+        assert len(result) == 60
+        assert all(video["duration"] == "PT4M13S" and video["view_count"] == 1024 for video in result)
+        assert [len(call.kwargs['id'].split(",")) for call in videos_list.call_args_list] == [50, 10]
+        assert videos_list.call_args.kwargs['part'] == "contentDetails,statistics"
+        assert videos_list.call_args.kwargs['fields'] == "items(id,contentDetails/duration,statistics/viewCount)"
+
+    def test_init_treats_empty_video_details_as_none(self, mock_youtube):
+        # A bare "video_details:" key in YAML loads as None
+        client = YouTubeClient({**self.config, "video_details": None})
+
+        assert client.video_details == []
+
+    def test_init_rejects_non_list_video_details(self, mock_youtube):
+        with pytest.raises(ValueError, match="'video_details' must be a list"):
+            YouTubeClient({**self.config, "video_details": "duration"})
+
+    def test_fetch_items_keeps_videos_when_details_fail(self, mock_youtube, caplog):
+        client = YouTubeClient({**self.config, "video_details": ["view_count"]})
+        client.channel_names_cache["UC123"] = "TechChannel"
+        mock_youtube.playlistItems.return_value.list.return_value.execute.return_value = PLAYLIST_RESPONSES["UU123"]
+        mock_youtube.videos.return_value.list.return_value.execute.side_effect = Exception("API Error")
+
+        result = client._fetch_items_for_source("UC123", SINCE)
+
+        assert [video["id"] for video in result] == ["tech_video"]
+        assert "view_count" not in result[0]
+        assert "Failed to fetch video details for channel 'UC123'" in caplog.text
+
+    def test_get_new_items_since_with_categories(self, mock_youtube):
         # Mock channel name lookup for both channels (now supports batch calls)
         def mock_channel_response(**kwargs):
-            channel_ids = kwargs.get('id', '')
-            if ',' in channel_ids:
-                # Batch call
-                ids = channel_ids.split(',')
-                items = []
-                for cid in ids:
-                    if cid == "UC123":
-                        items.append({"id": "UC123", "snippet": {"title": "TechChannel"}})
-                    elif cid == "UC456":
-                        items.append({"id": "UC456", "snippet": {"title": "EduChannel"}})
-                return Mock(execute=lambda: {"items": items})
-            else:
-                # Single call
-                if channel_ids == "UC123":
-                    return Mock(execute=lambda: {"items": [{"id": "UC123", "snippet": {"title": "TechChannel"}}]})
-                elif channel_ids == "UC456":
-                    return Mock(execute=lambda: {"items": [{"id": "UC456", "snippet": {"title": "EduChannel"}}]})
-            return Mock(execute=lambda: {"items": []})
+            ids = kwargs.get('id', '').split(',')
+            return api_response({"items": [CHANNEL_ITEMS[cid] for cid in ids if cid in CHANNEL_ITEMS]})
 
         mock_youtube.channels.return_value.list.side_effect = mock_channel_response
 
-        # Mock search API responses
-        def mock_search_response(**kwargs):
-            channelId = kwargs.get('channelId')
-            if channelId == "UC123":
-                return Mock(execute=lambda: {
-                    "items": [{
-                        "id": {"videoId": "tech_video"},
-                        "snippet": {
-                            "title": "Tech Video",
-                            "publishedAt": "2024-01-02T12:00:00Z"
-                        }
-                    }]
-                })
-            elif channelId == "UC456":
-                return Mock(execute=lambda: {
-                    "items": [{
-                        "id": {"videoId": "edu_video"},
-                        "snippet": {
-                            "title": "Education Video",
-                            "publishedAt": "2024-01-02T12:00:00Z"
-                        }
-                    }]
-                })
-            return Mock(execute=lambda: {"items": []})
-
-        mock_youtube.search.return_value.list.side_effect = mock_search_response
+        # Mock uploads playlist responses
+        def mock_playlist_response(**kwargs):
+            return api_response(PLAYLIST_RESPONSES.get(kwargs.get('playlistId'), EMPTY_RESPONSE))
+
+        mock_youtube.playlistItems.return_value.list.side_effect = mock_playlist_response
 
         client = YouTubeClient(self.categorized_config)
-        since_datetime = datetime(2024, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+        since_datetime = SINCE
 
         result = client.get_new_items_since(since_datetime)
 
@@ -292,14 +430,152 @@ class TestYouTubeClient:
         assert edu_item["channel_id"] == "UC456"
         assert edu_item["channel_name"] == "EduChannel"
 
-    @patch('src.youtube_client.build')
-    def test_channel_name_caching_across_calls(self, mock_build):
-        mock_youtube = Mock()
-        mock_build.return_value = mock_youtube
+        # Both names should come from a single batched lookup
+        mock_youtube.channels.return_value.list.assert_called_once_with(
+            part="snippet,contentDetails",
+            id="UC123,UC456",
+            fields=youtube_client.CHANNEL_FIELDS,
+            prettyPrint=False
+        )
+
+    def test_get_new_items_since_fetches_channels_concurrently(self, mock_youtube, seeded_client):
+        # Each request blocks until the other channel's request is in flight too
+        barrier = threading.Barrier(2, timeout=5)
+
+        def mock_playlist_response(**kwargs):
+            def execute(**execute_kwargs):
+                barrier.wait()
+                return PLAYLIST_RESPONSES[kwargs['playlistId']]
+            return SimpleNamespace(execute=execute)
+
+        mock_youtube.playlistItems.return_value.list.side_effect = mock_playlist_response
+
+        result = seeded_client.get_new_items_since(SINCE)
+
+        # Results still come back in configured channel order
+        assert [item["id"] for item in result] == ["tech_video", "edu_video"]
+
+    @pytest.fixture
+    def cached_client(self, mock_youtube, tmp_path):
+        """A seeded client with the on-disk response cache enabled under tmp_path."""
+        client = YouTubeClient({**self.config, "cache_ttl_minutes": 10, "cache_dir": str(tmp_path)})
+        client.channel_names_cache.update({"UC123": "TechChannel", "UC456": "EduChannel"})
+        playlist_request = mock_youtube.playlistItems.return_value.list.return_value
+        playlist_request.execute.return_value = PLAYLIST_RESPONSES["UU123"]
+        return client
+
+    def test_list_uploads_cache_disabled_by_default(self, mock_youtube, seeded_client):
+        playlist_request = mock_youtube.playlistItems.return_value.list.return_value
+        playlist_request.execute.return_value = PLAYLIST_RESPONSES["UU123"]
+
+        seeded_client._list_uploads("UU123", SINCE)
+        seeded_client._list_uploads("UU123", SINCE)
+
+        assert playlist_request.execute.call_count == 2
+
+    def test_list_uploads_served_from_cache(self, mock_youtube, cached_client):
+        first = cached_client._list_uploads("UU123", SINCE)
+        second = cached_client._list_uploads("UU123", SINCE)
+
+        assert second == first == PLAYLIST_RESPONSES["UU123"]["items"]
+        mock_youtube.playlistItems.return_value.list.return_value.execute.assert_called_once()
+
+    def test_list_uploads_cache_serves_later_cutoffs(self, mock_youtube, cached_client):
+        # The listing stops at the first page reaching back past the cutoff
+        playlist_request = mock_youtube.playlistItems.return_value.list.return_value
+        playlist_request.execute.return_value = {
+            "items": [
+                upload("new_video", "New Video", "2024-01-02T12:00:00Z"),
+                upload("old_video", "Old Video", "2023-06-01T12:00:00Z"),
+            ],
+            "nextPageToken": "more"
+        }
+
+        cached_client._list_uploads("UU123", SINCE)
+        # A later cutoff (the next scheduled run) is covered by the cached listing...
+        cached_client._list_uploads("UU123", SINCE + timedelta(hours=1))
+        assert playlist_request.execute.call_count == 1
+
+        # ...but an earlier one needs pages the listing never read
+        cached_client._list_uploads("UU123", SINCE - timedelta(days=30))
+        assert playlist_request.execute.call_count == 2
+
+    def test_list_uploads_cache_serves_any_cutoff_for_complete_listing(self, mock_youtube, cached_client):
+        cached_client._list_uploads("UU123", SINCE)
+        cached_client._list_uploads("UU123", SINCE - timedelta(days=365))
 
+        mock_youtube.playlistItems.return_value.list.return_value.execute.assert_called_once()
+
+    def test_get_new_items_since_prunes_expired_cache_entries(self, mock_youtube, cached_client):
+        stale = cached_client.cache_dir / "stale.json"
+        stale.write_text("{}")
+        expired = youtube_client.time.time() - cached_client.cache_ttl - 1
+        os.utime(stale, (expired, expired))
+
+        cached_client.get_new_items_since(SINCE)
+
+        assert not stale.exists()
+        # Both channels' listings were written back
+        assert len(list(cached_client.cache_dir.iterdir())) == 2
+
+    def test_list_uploads_cache_expires(self, mock_youtube, cached_client, monkeypatch):
+        cached_client._list_uploads("UU123", SINCE)
+        later = youtube_client.time.time() + cached_client.cache_ttl + 1
+        monkeypatch.setattr(youtube_client.time, 'time', lambda: later)
+
+        cached_client._list_uploads("UU123", SINCE)
+
+        assert mock_youtube.playlistItems.return_value.list.return_value.execute.call_count == 2
+
+    def test_list_uploads_refetches_after_cache_dir_cleared(self, mock_youtube, cached_client):
+        cached_client._list_uploads("UU123", SINCE)
+        for entry in cached_client.cache_dir.iterdir():
+            entry.unlink()
+        cached_client._list_uploads("UU123", SINCE)
+
+        assert mock_youtube.playlistItems.return_value.list.return_value.execute.call_count == 2
+
+    def test_api_calls_retry_and_respect_rate_limit(self, mock_youtube, seeded_client, monkeypatch):
+        acquired = []
+        monkeypatch.setattr(seeded_client._limiter, 'acquire', lambda: acquired.append(True))
+        playlist_request = mock_youtube.playlistItems.return_value.list.return_value
+        playlist_request.execute.return_value = EMPTY_RESPONSE
+
+        seeded_client._fetch_items_for_source("UC123", SINCE)
+
+        assert acquired == [True]
+        assert playlist_request.execute.call_args.kwargs['num_retries'] == youtube_client.API_RETRIES
+
+    def test_rate_limit_disabled(self, mock_youtube):
+        client = YouTubeClient({**self.config, "requests_per_second": 0})
+
+        assert client._limiter is None
+
+    def test_get_new_items_since_sequential_when_max_concurrency_is_one(self, mock_youtube, monkeypatch):
+        client = YouTubeClient({**self.config, "max_concurrency": 1})
+        client.channel_names_cache.update({"UC123": "TechChannel", "UC456": "EduChannel"})
+        monkeypatch.setattr(youtube_client, 'ThreadPoolExecutor', Mock(side_effect=AssertionError("pool used")))
+
+        def mock_playlist_response(**kwargs):
+            return api_response(PLAYLIST_RESPONSES[kwargs['playlistId']])
+
+        mock_youtube.playlistItems.return_value.list.side_effect = mock_playlist_response
+
+        result = client.get_new_items_since(SINCE)
+
+        assert [item["id"] for item in result] == ["tech_video", "edu_video"]
+
+    def test_init_coalesces_duplicate_channels(self, mock_youtube):
+        client = YouTubeClient({
+            "api_key": "test_api_key",
+            "categories": {"tech": ["UC123", "UC456"], "favourites": ["UC123"]}
+        })
+
+        assert client.channels == ["UC123", "UC456"]
+
+    def test_channel_name_caching_across_calls(self, mock_youtube):
         # Mock channel name lookup - should only be called once due to caching
-        mock_request = Mock()
-        mock_youtube.channels.return_value.list.return_value = mock_request
+        mock_request = mock_youtube.channels.return_value.list.return_value
         mock_request.execute.return_value = {
             "items": [{"id": "UC123", "snippet": {"title": "TechChannel"}}]
         }
@@ -316,4 +592,58 @@ class TestYouTubeClient:
         assert name3 == "TechChannel"
 
         # API should only be called once due to caching
-        mock_youtube.channels.return_value.list.assert_called_once()
\ No newline at end of file
+        mock_youtube.channels.return_value.list.assert_called_once()
+
+
+class TestRateLimiter:
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        """Fake monotonic clock that advances only when the limiter sleeps."""
+        clock = SimpleNamespace(now=0.0, sleeps=[])
+
+        def sleep(seconds):
+            clock.sleeps.append(seconds)
+            clock.now += seconds
+
+        monkeypatch.setattr(youtube_client.time, 'monotonic', lambda: clock.now)
+        monkeypatch.setattr(youtube_client.time, 'sleep', sleep)
+        return clock
+
+    def test_burst_up_to_rate_without_sleeping(self, clock):
+        limiter = youtube_client._RateLimiter(5)
+
+        for _ in range(5):
+            limiter.acquire()
+
+        assert clock.sleeps == []
+
+    def test_sleeps_once_bucket_is_empty(self, clock):
+        limiter = youtube_client._RateLimiter(2)
+
+        for _ in range(4):
+            limiter.acquire()
+
+        assert clock.sleeps == [pytest.approx(0.5), pytest.approx(0.5)]
+
+    def test_refills_over_time(self, clock):
+        limiter = youtube_client._RateLimiter(2)
+        limiter.acquire()
+        limiter.acquire()
+
+        clock.now += 1.0
+        limiter.acquire()
+        limiter.acquire()
+
+        assert clock.sleeps == []
+
+
+class TestOrjsonModel:
+    @pytest.mark.parametrize("content", [
+        pytest.param(b'{"items": [{"snippet": {"title": "Caf\xc3\xa9"}}]}', id="bytes"),
+        pytest.param('{"items": [{"snippet": {"title": "Caf\u00e9"}}]}', id="str"),
+    ])
+    def test_deserialize_matches_stdlib(self, content):
+        assert youtube_client._OrjsonModel().deserialize(content) == JsonModel().deserialize(content)
+
+    def test_deserialize_non_json_falls_back(self):
+        assert youtube_client._OrjsonModel().deserialize(b"Not Found") == "Not Found"